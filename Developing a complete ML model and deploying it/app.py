@@ -1,8 +1,9 @@
 import os
-import joblib
 import pandas as pd
 import streamlit as st
 import numpy as np
+import altair as alt
+from model.flat_forest import load_predictor
 
 # Page Config
 st.set_page_config(page_title="California Housing Price Predictor", page_icon="🏡", layout="centered")
@@ -10,59 +11,99 @@ st.set_page_config(page_title="California Housing Price Predictor", page_icon="
 st.title("🏡 California Housing Price Predictor")
 st.markdown("This ML web application predicts median house values in California based on various features using a **RandomForestRegressor** model.")
 
+# Slider config: feature -> (label, min, max, default, step)
+# Sliders snap to `step`, so every prediction input is quantised and cacheable.
+FEATURE_SLIDERS = {
+    'MedInc': ("Median Income (in $10,000s)", 0.0, 15.0, 5.0, 0.1),
+    'HouseAge': ("House Age (Years)", 1.0, 55.0, 20.0, 1.0),
+    'AveRooms': ("Average Rooms", 1.0, 15.0, 5.0, 0.1),
+    'AveBedrms': ("Average Bedrooms", 0.5, 5.0, 1.0, 0.05),
+    'Population': ("Population", 10.0, 10000.0, 1000.0, 10.0),
+    'AveOccup': ("Average Occupancy", 1.0, 10.0, 3.0, 0.1),
+    'Latitude': ("Latitude", 32.0, 42.0, 35.0, 0.05),
+    'Longitude': ("Longitude", -125.0, -114.0, -120.0, 0.05),
+}
+FEATURES = list(FEATURE_SLIDERS)
+
 # Load Model Function with caching
+# Prefers the memory-mapped flat forest, which avoids unpickling on cold start
 @st.cache_resource
 def load_model():
-    model_path = os.path.join(os.path.dirname(__file__), 'model', 'rf_model.joblib')
-    if os.path.exists(model_path):
-        return joblib.load(model_path)
-    return None
+    return load_predictor(os.path.join(os.path.dirname(__file__), 'model'))
 
 model = load_model()
 
+# Memoised single prediction, keyed on the quantised slider values
+@st.cache_data(max_entries=10000)
+def predict_price(features):
+    return float(model.predict(pd.DataFrame([features], columns=FEATURES))[0])
+
+# One vectorised predict over a grid of one or two swept features
+@st.cache_data(max_entries=100)
+def sensitivity_sweep(features, swept, resolution):
+    axes = [
+        np.linspace(FEATURE_SLIDERS[name][1], FEATURE_SLIDERS[name][2], resolution)
+        for name in swept
+    ]
+    grid = np.meshgrid(*axes, indexing='ij')
+
+    df_grid = pd.DataFrame(np.tile(features, (grid[0].size, 1)), columns=FEATURES)
+    for name, values in zip(swept, grid):
+        df_grid[name] = values.ravel()
+
+    # The target in California Housing is in 100,000s of dollars
+    df_grid['Predicted Price (USD)'] = model.predict(df_grid) * 100000
+    return df_grid
+
 if model is None:
     st.error("Model not found! Please make sure you have run the training script `train.py`.")
 else:
     st.sidebar.header("User Input Features")
     st.sidebar.markdown("Use the sliders below to adjust the features.")
-    
+
     # Inputs based on California housing dataset features
     def user_input_features():
-        med_inc = st.sidebar.slider("Median Income (in $10,000s)", 0.0, 15.0, 5.0)
-        house_age = st.sidebar.slider("House Age (Years)", 1.0, 55.0, 20.0)
-        ave_rooms = st.sidebar.slider("Average Rooms", 1.0, 15.0, 5.0)
-        ave_bedrms = st.sidebar.slider("Average Bedrooms", 0.5, 5.0, 1.0)
-        population = st.sidebar.slider("Population", 10.0, 10000.0, 1000.0)
-        ave_occup = st.sidebar.slider("Average Occupancy", 1.0, 10.0, 3.0)
-        latitude = st.sidebar.slider("Latitude", 32.0, 42.0, 35.0)
-        longitude = st.sidebar.slider("Longitude", -125.0, -114.0, -120.0)
-        
         data = {
-            'MedInc': med_inc,
-            'HouseAge': house_age,
-            'AveRooms': ave_rooms,
-            'AveBedrms': ave_bedrms,
-            'Population': population,
-            'AveOccup': ave_occup,
-            'Latitude': latitude,
-            'Longitude': longitude
+            name: st.sidebar.slider(label, min_value, max_value, default, step)
+            for name, (label, min_value, max_value, default, step) in FEATURE_SLIDERS.items()
         }
         return pd.DataFrame(data, index=[0])
-        
+
     df_input = user_input_features()
-    
+    features = tuple(float(v) for v in df_input.iloc[0])
+
     st.subheader("Selected Features")
     st.write(df_input)
-    
+
     # Prediction
     st.subheader("Price Prediction")
     if st.button("Predict House Price"):
         with st.spinner('Calculating prediction...'):
-            prediction = model.predict(df_input)[0]
+            prediction = predict_price(features)
             # The target in California Housing is in 100,000s of dollars
             predicted_price_usd = prediction * 100000
-            
+
             st.success(f"The estimated median house value is **${predicted_price_usd:,.2f}**")
-            
+
+    # Sensitivity Sweep
+    st.subheader("Sensitivity Sweep")
+    st.markdown("Vary one or two features across their full range, holding the others at the sidebar values.")
+    swept = st.multiselect("Features to sweep", FEATURES, default=['MedInc'], max_selections=2)
+    resolution = st.slider("Grid points per feature", 10, 100, 50)
+
+    if swept:
+        df_sweep = sensitivity_sweep(features, tuple(swept), resolution)
+        if len(swept) == 1:
+            st.line_chart(df_sweep, x=swept[0], y='Predicted Price (USD)')
+        else:
+            heatmap = alt.Chart(df_sweep).mark_rect().encode(
+                x=alt.X(f'{swept[0]}:Q', bin=alt.Bin(maxbins=resolution)),
+                y=alt.Y(f'{swept[1]}:Q', bin=alt.Bin(maxbins=resolution)),
+                color=alt.Color('Predicted Price (USD):Q', scale=alt.Scale(scheme='viridis')),
+                tooltip=[swept[0], swept[1], alt.Tooltip('Predicted Price (USD):Q', format='$,.0f')],
+            )
+            st.altair_chart(heatmap)
+        st.caption(f"{len(df_sweep):,} predictions from a single batched call.")
+
     st.markdown("---")
     st.markdown("*Model built and deployed by Antigravity*")
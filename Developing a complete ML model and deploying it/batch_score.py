@@ -0,0 +1,95 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from model.flat_forest import load_predictor
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model')
+
+# California housing features, in training order
+FEATURES = ['MedInc', 'HouseAge', 'AveRooms', 'AveBedrms', 'Population', 'AveOccup', 'Latitude', 'Longitude']
+
+
+def score_frame(model, df):
+    """Predict a whole DataFrame in one vectorised call and return it with a price column."""
+    missing = [col for col in FEATURES if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+
+    predictions = model.predict(df[FEATURES])
+    # The target in California Housing is in 100,000s of dollars
+    return df.assign(predicted_value=predictions, predicted_price_usd=predictions * 100000)
+
+
+def score_file(model, input_path, output_path, chunksize=100000):
+    """Stream a CSV through the model chunk by chunk so memory stays bounded."""
+    rows = 0
+    start = time.perf_counter()
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+        scored = score_frame(model, chunk)
+        scored.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        rows += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) -> {output_path}")
+
+
+def make_handler(model):
+    class ScoreHandler(BaseHTTPRequestHandler):
+        """POST /predict with a CSV body (or a JSON list of records) returns the scored rows."""
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self.send_error(404)
+                return
+
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            is_json = self.headers.get('Content-Type', '').startswith('application/json')
+            try:
+                df = pd.DataFrame(json.loads(body)) if is_json else pd.read_csv(io.BytesIO(body))
+                scored = score_frame(model, df)
+            except Exception as e:
+                self.send_error(400, str(e))
+                return
+
+            if is_json:
+                payload = scored.to_json(orient='records').encode()
+                content_type = 'application/json'
+            else:
+                payload = scored.to_csv(index=False).encode()
+                content_type = 'text/csv'
+
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return ScoreHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch scorer for the California housing model")
+    parser.add_argument("input", nargs='?', help="CSV file with the housing feature columns")
+    parser.add_argument("-o", "--output", help="Where to write scored rows (default: <input>_scored.csv)")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--serve", action='store_true', help="Run an HTTP scoring server instead")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    model = load_predictor(MODEL_DIR)
+    if model is None:
+        print("Model not found! Please make sure you have run the training script `train.py`.")
+        sys.exit(1)
+
+    if args.serve:
+        print(f"Serving batch predictions on http://0.0.0.0:{args.port}/predict")
+        ThreadingHTTPServer(('0.0.0.0', args.port), make_handler(model)).serve_forever()
+    elif args.input:
+        output = args.output or f"{os.path.splitext(args.input)[0]}_scored.csv"
+        score_file(model, args.input, output, chunksize=args.chunksize)
+    else:
+        parser.error("either an input file or --serve is required")
@@ -0,0 +1,71 @@
+import os
+import time
+import tempfile
+import argparse
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.datasets import fetch_california_housing
+from flat_forest import FlatForest, artifact_size
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def time_load(loader, X, repeats):
+    """Best-of-N cold load time plus the latency of the first batch predict."""
+    load_times, predict_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model = loader()
+        load_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        model.predict(X)
+        predict_times.append(time.perf_counter() - start)
+    return min(load_times), min(predict_times)
+
+
+def run_benchmark(repeats=3, batch_size=1000):
+    model_path = os.path.join(MODEL_DIR, 'rf_model.joblib')
+    flat_path = os.path.join(MODEL_DIR, 'rf_model_flat')
+    if not os.path.exists(model_path):
+        print("Model not found! Run train.py first.")
+        return
+
+    california = fetch_california_housing()
+    X = pd.DataFrame(california.data[:batch_size], columns=california.feature_names)
+
+    model = joblib.load(model_path)
+    if not os.path.exists(os.path.join(flat_path, 'meta.json')):
+        FlatForest.from_sklearn(model).save(flat_path)
+
+    # Parity check before timing anything
+    max_diff = np.abs(FlatForest.load(flat_path).predict(X) - model.predict(X)).max()
+    print(f"Flat vs sklearn max abs difference: {max_diff:.2e}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compressed_path = os.path.join(tmp, 'rf_model_z3.joblib')
+        joblib.dump(model, compressed_path, compress=3)
+        del model
+
+        variants = [
+            ("joblib", model_path, lambda: joblib.load(model_path)),
+            ("joblib compress=3", compressed_path, lambda: joblib.load(compressed_path)),
+            ("joblib mmap_mode='r'", model_path, lambda: joblib.load(model_path, mmap_mode='r')),
+            ("flat forest (mmap)", flat_path, lambda: FlatForest.load(flat_path)),
+            ("flat forest (in RAM)", flat_path, lambda: FlatForest.load(flat_path, mmap_mode=None)),
+        ]
+
+        print(f"\n{'Artifact':<24}{'Size (MB)':>12}{'Load (s)':>12}{f'Predict {batch_size} (s)':>22}")
+        for name, path, loader in variants:
+            load_s, predict_s = time_load(loader, X, repeats)
+            size_mb = artifact_size(path) / 1e6
+            print(f"{name:<24}{size_mb:>12.1f}{load_s:>12.3f}{predict_s:>22.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark housing model artifact formats")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    run_benchmark(repeats=args.repeats, batch_size=args.batch_size)
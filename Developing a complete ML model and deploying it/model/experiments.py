@@ -0,0 +1,56 @@
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+EXPERIMENTS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'experiments.db')
+
+RUN_COLUMNS = [
+    'n_estimators', 'max_depth', 'n_jobs', 'fit_time_s', 'predict_latency_ms',
+    'batch_predict_s', 'artifact_mb', 'mse', 'r2',
+]
+
+
+def connect(db_path=EXPERIMENTS_DB):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_at TEXT NOT NULL,
+            n_estimators INTEGER,
+            max_depth INTEGER,
+            n_jobs INTEGER,
+            fit_time_s REAL,
+            predict_latency_ms REAL,
+            batch_predict_s REAL,
+            artifact_mb REAL,
+            mse REAL,
+            r2 REAL,
+            promoted INTEGER DEFAULT 0
+        )
+    """)
+    return conn
+
+
+def log_run(run, db_path=EXPERIMENTS_DB):
+    """Record one training run and return its id."""
+    with closing(connect(db_path)) as conn, conn:
+        cursor = conn.execute(
+            f"INSERT INTO runs (run_at, {', '.join(RUN_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' for _ in RUN_COLUMNS)})",
+            [datetime.now().isoformat()] + [run[col] for col in RUN_COLUMNS],
+        )
+        return cursor.lastrowid
+
+
+def mark_promoted(run_id, db_path=EXPERIMENTS_DB):
+    """Flag `run_id` as the model currently deployed as rf_model.joblib."""
+    with closing(connect(db_path)) as conn, conn:
+        conn.execute("UPDATE runs SET promoted = 0")
+        conn.execute("UPDATE runs SET promoted = 1 WHERE id = ?", (run_id,))
+
+
+def load_runs(db_path=EXPERIMENTS_DB):
+    with closing(connect(db_path)) as conn:
+        return [dict(row) for row in conn.execute("SELECT * FROM runs ORDER BY id")]
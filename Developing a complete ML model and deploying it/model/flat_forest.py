@@ -0,0 +1,125 @@
+import os
+import json
+import numpy as np
+
+# Arrays that make up a flattened forest; each is saved as its own .npy file
+# so it can be memory-mapped on load instead of unpickled.
+FLAT_ARRAYS = ['left', 'right', 'feature', 'threshold', 'value', 'roots']
+
+
+class FlatForest:
+    """
+    Compiled representation of a fitted RandomForestRegressor.
+
+    Every tree's nodes are concatenated into flat NumPy arrays. Leaves point
+    to themselves with an infinite threshold, so walking all trees for a whole
+    batch is just `max_depth` rounds of fancy indexing.
+    """
+
+    def __init__(self, left, right, feature, threshold, value, roots, max_depth, feature_names):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.feature_names = feature_names
+
+    @classmethod
+    def from_sklearn(cls, model):
+        left, right, feature, threshold, value, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+
+            left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            value.append(tree.value[:, 0, 0])
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        feature_names = list(getattr(model, 'feature_names_in_', []))
+        return cls(
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float64),
+            value=np.concatenate(value).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=int(max_depth),
+            feature_names=feature_names,
+        )
+
+    def _as_array(self, X):
+        # Reorder DataFrame columns to the training order; sklearn compares
+        # float32 features against float64 thresholds, so we do the same.
+        if hasattr(X, 'columns') and self.feature_names:
+            X = X[self.feature_names]
+        return np.asarray(X, dtype=np.float32)
+
+    def predict(self, X, chunk_size=10000):
+        X = self._as_array(X)
+        predictions = np.empty(len(X), dtype=np.float64)
+
+        for start in range(0, len(X), chunk_size):
+            chunk = X[start:start + chunk_size]
+            rows = np.arange(len(chunk))[:, None]
+            nodes = np.broadcast_to(self.roots, (len(chunk), len(self.roots)))
+
+            for _ in range(self.max_depth):
+                go_left = chunk[rows, self.feature[nodes]] <= self.threshold[nodes]
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+            predictions[start:start + chunk_size] = self.value[nodes].mean(axis=1)
+
+        return predictions
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in FLAT_ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'max_depth': self.max_depth, 'feature_names': self.feature_names}, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+            for name in FLAT_ARRAYS
+        }
+        return cls(**arrays, **meta)
+
+
+def artifact_size(path):
+    """Size on disk in bytes of a file or an artifact directory."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def load_predictor(model_dir):
+    """
+    Load the fastest available housing model from `model_dir`.
+
+    Prefers the memory-mapped flat forest and falls back to the joblib pickle.
+    Both returned objects expose `predict(X)`.
+    """
+    flat_path = os.path.join(model_dir, 'rf_model_flat')
+    if os.path.exists(os.path.join(flat_path, 'meta.json')):
+        return FlatForest.load(flat_path)
+
+    model_path = os.path.join(model_dir, 'rf_model.joblib')
+    if os.path.exists(model_path):
+        import joblib
+        return joblib.load(model_path)
+    return None
@@ -1,39 +1,146 @@
 import os
+import time
+import tempfile
+import argparse
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.datasets import fetch_california_housing
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
+from flat_forest import FlatForest
+from experiments import log_run, mark_promoted
 
-def train_model():
+def load_data():
     print("Fetching California Housing Dataset...")
     california = fetch_california_housing()
-    
+
     X = pd.DataFrame(california.data, columns=california.feature_names)
     y = california.target
-    
+
     # Split the dataset
     print("Splitting dataset into train and test sets...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # Initialize and train the final model
-    print("Training RandomForestRegressor model...")
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+def fit_and_evaluate(X_train, X_test, y_train, y_test, n_estimators=100, max_depth=None, n_jobs=-1):
+    """Fit one forest and measure everything the experiment log records."""
+    model = RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth,
+                                  n_jobs=n_jobs, random_state=42)
+    start = time.perf_counter()
     model.fit(X_train, y_train)
-    
-    # Predict and evaluate
+    fit_time = time.perf_counter() - start
+
+    # The app predicts one row at a time, where thread fan-out only adds overhead
+    model.set_params(n_jobs=1)
     y_pred = model.predict(X_test)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
-    
-    print(f"Model Evaluation -> MSE: {mse:.4f}, R2 Score: {r2:.4f}")
-    
+
+    # Latencies are measured on the flattened forest, which is what the app serves
+    flat = FlatForest.from_sklearn(model)
+    start = time.perf_counter()
+    flat.predict(X_test)
+    batch_predict = time.perf_counter() - start
+
+    single_row_times = []
+    for i in range(50):
+        start = time.perf_counter()
+        flat.predict(X_test.iloc[i:i + 1])
+        single_row_times.append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_path = os.path.join(tmp, 'model.joblib')
+        joblib.dump(model, artifact_path)
+        artifact_mb = os.path.getsize(artifact_path) / 1e6
+
+    run = {
+        'n_estimators': n_estimators,
+        'max_depth': max_depth,
+        'n_jobs': n_jobs,
+        'fit_time_s': fit_time,
+        'predict_latency_ms': float(np.median(single_row_times)) * 1000,
+        'batch_predict_s': batch_predict,
+        'artifact_mb': artifact_mb,
+        'mse': mean_squared_error(y_test, y_pred),
+        'r2': r2_score(y_test, y_pred),
+    }
+    return model, run
+
+def train_model(n_estimators=100, max_depth=None, n_jobs=-1):
+    X_train, X_test, y_train, y_test = load_data()
+
+    # Initialize and train the final model
+    print(f"Training RandomForestRegressor model (n_jobs={n_jobs})...")
+    model, run = fit_and_evaluate(X_train, X_test, y_train, y_test,
+                                  n_estimators=n_estimators, max_depth=max_depth, n_jobs=n_jobs)
+
+    print(f"Model Evaluation -> MSE: {run['mse']:.4f}, R2 Score: {run['r2']:.4f}")
+
+    run_id = log_run(run)
+    save_artifacts(model, os.path.dirname(__file__))
+    mark_promoted(run_id)
+
+def run_sweep(estimator_grid=(25, 50, 100, 200), depth_grid=(10, 20, None), n_jobs=-1,
+              latency_budget_ms=None):
+    """
+    Train every (n_estimators, max_depth) combination, log each run, and
+    promote the most accurate model whose single-row latency fits the budget.
+    """
+    X_train, X_test, y_train, y_test = load_data()
+
+    best = None
+    for n_estimators in estimator_grid:
+        for max_depth in depth_grid:
+            print(f"Training n_estimators={n_estimators}, max_depth={max_depth}...")
+            model, run = fit_and_evaluate(X_train, X_test, y_train, y_test,
+                                          n_estimators=n_estimators, max_depth=max_depth, n_jobs=n_jobs)
+            run_id = log_run(run)
+            print(f"  fit {run['fit_time_s']:.2f}s | predict {run['predict_latency_ms']:.2f}ms/row | "
+                  f"{run['artifact_mb']:.1f}MB | MSE {run['mse']:.4f} | R2 {run['r2']:.4f}")
+
+            within_budget = latency_budget_ms is None or run['predict_latency_ms'] <= latency_budget_ms
+            if within_budget and (best is None or run['r2'] > best[2]['r2']):
+                best = (run_id, model, run)
+
+    if best is None:
+        print(f"No run met the {latency_budget_ms}ms latency budget; keeping the current model.")
+        return None
+
+    run_id, model, run = best
+    print(f"Promoting run {run_id} (n_estimators={run['n_estimators']}, max_depth={run['max_depth']}, "
+          f"R2 {run['r2']:.4f}, {run['predict_latency_ms']:.2f}ms/row)")
+    save_artifacts(model, os.path.dirname(__file__))
+    mark_promoted(run_id)
+    return run_id
+
+def save_artifacts(model, model_dir):
     # Save the model
-    os.makedirs(os.path.dirname(__file__), exist_ok=True)
-    model_path = os.path.join(os.path.dirname(__file__), 'rf_model.joblib')
+    os.makedirs(model_dir, exist_ok=True)
+    model_path = os.path.join(model_dir, 'rf_model.joblib')
     joblib.dump(model, model_path)
     print(f"Model saved to {model_path}")
 
+    # Save the flattened forest, which loads via mmap instead of unpickling
+    flat_path = os.path.join(model_dir, 'rf_model_flat')
+    FlatForest.from_sklearn(model).save(flat_path)
+    print(f"Flat model saved to {flat_path}")
+
+def parse_depth(value):
+    return None if value.lower() == 'none' else int(value)
+
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the California housing model")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Cores used for fitting (-1 = all)")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--max-depth", type=parse_depth, default=None)
+    parser.add_argument("--sweep", action='store_true', help="Sweep estimator count and depth")
+    parser.add_argument("--estimator-grid", type=int, nargs='+', default=[25, 50, 100, 200])
+    parser.add_argument("--depth-grid", type=parse_depth, nargs='+', default=[10, 20, None])
+    parser.add_argument("--latency-budget-ms", type=float, default=None,
+                        help="Only promote sweep runs whose single-row predict is under this")
+    args = parser.parse_args()
+
+    if args.sweep:
+        run_sweep(args.estimator_grid, args.depth_grid, n_jobs=args.n_jobs,
+                  latency_budget_ms=args.latency_budget_ms)
+    else:
+        train_model(n_estimators=args.n_estimators, max_depth=args.max_depth, n_jobs=args.n_jobs)
@@ -0,0 +1,89 @@
+"""
+Offline OCR backend benchmark.
+
+Point it at a folder of sample images, each with a ground-truth transcript
+next to it (receipt1.jpg + receipt1.txt). Every backend runs over the same
+pre-processed images and reports throughput, latency and character error rate.
+
+    python benchmark.py samples/ --engines easyocr tesseract auto
+"""
+import os
+import time
+import argparse
+import numpy as np
+from image_utils import decode_image
+from ocr_engine import OCREngine, BACKENDS, ROUTING_ENGINE
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp")
+
+
+def normalise(text: str) -> str:
+    return " ".join(text.split())
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(predicted: str, truth: str) -> float:
+    predicted, truth = normalise(predicted), normalise(truth)
+    return edit_distance(predicted, truth) / max(len(truth), 1)
+
+
+def load_samples(sample_dir: str):
+    samples = []
+    for name in sorted(os.listdir(sample_dir)):
+        stem, ext = os.path.splitext(name)
+        truth_path = os.path.join(sample_dir, stem + ".txt")
+        if ext.lower() in IMAGE_EXTENSIONS and os.path.exists(truth_path):
+            with open(os.path.join(sample_dir, name), "rb") as f:
+                image = decode_image(f.read())
+            with open(truth_path, encoding="utf-8") as f:
+                samples.append((name, image, f.read()))
+    return samples
+
+
+def run_benchmark(sample_dir: str, engines):
+    samples = load_samples(sample_dir)
+    if not samples:
+        print(f"No image + .txt pairs found in {sample_dir}")
+        return
+
+    backends = [name for name in engines if name != ROUTING_ENGINE]
+    engine = OCREngine(backends=backends or tuple(BACKENDS))
+    print(f"{len(samples)} samples, backends loaded: {', '.join(engine.backends) or 'none'}\n")
+    print(f"{'Engine':<12}{'img/s':>8}{'p50 ms':>10}{'p95 ms':>10}{'CER':>8}")
+
+    for name in engines:
+        if name != ROUTING_ENGINE and name not in engine.backends:
+            print(f"{name:<12}{'unavailable':>36}")
+            continue
+
+        # One untimed call so lazy model initialisation doesn't skew the first sample
+        engine.extract(samples[0][1], name)
+
+        latencies, errors = [], []
+        start = time.perf_counter()
+        for _, image, truth in samples:
+            t0 = time.perf_counter()
+            text, _ = engine.extract(image, name)
+            latencies.append(time.perf_counter() - t0)
+            errors.append(character_error_rate(text, truth))
+        elapsed = time.perf_counter() - start
+
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        print(f"{name:<12}{len(samples) / elapsed:>8.2f}{p50:>10.1f}{p95:>10.1f}{np.mean(errors):>8.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark OCR backends on a local sample set")
+    parser.add_argument("sample_dir", help="Folder of images with same-name .txt ground truth")
+    parser.add_argument("--engines", nargs="+", default=[*BACKENDS, ROUTING_ENGINE])
+    args = parser.parse_args()
+    run_benchmark(args.sample_dir, args.engines)
@@ -0,0 +1,91 @@
+import io
+import os
+import numpy as np
+from typing import List, Optional
+from PIL import Image, ImageOps
+
+# Upload and pre-processing limits (overridable through the environment)
+MAX_UPLOAD_BYTES = int(os.getenv("OCR_MAX_UPLOAD_MB", "20")) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+MAX_DIMENSION = int(os.getenv("OCR_MAX_DIMENSION", "2500"))
+MAX_PIXELS = 100_000_000
+
+
+class ImageTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES or MAX_PIXELS."""
+
+
+class TooManyPagesError(Exception):
+    """Raised when a PDF has more pages than the caller allows."""
+
+
+async def read_upload(file, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """
+    Read an UploadFile in chunks, stopping as soon as it exceeds `max_bytes`.
+
+    This bounds the copy we hold in memory, not what the server accepts:
+    Starlette has already parsed the whole multipart body into a spooled
+    temporary file before the endpoint runs. Limit the request body size in
+    the reverse proxy (e.g. nginx client_max_body_size) to cap that.
+    """
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise ImageTooLargeError(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit.")
+    return bytes(buffer)
+
+
+def decode_image(data: bytes, target_dpi: int = TARGET_DPI, max_dimension: int = MAX_DIMENSION,
+                 grayscale: bool = True) -> np.ndarray:
+    """
+    Decode image bytes straight into a NumPy array for OCR.
+
+    Large phone photos are downscaled to `target_dpi` (when the file records
+    its DPI) and to at most `max_dimension` pixels on the longest side, and
+    converted to grayscale. EasyOCR's cost grows with pixel count, so this is
+    where most of the time on big uploads is saved.
+    """
+    image = Image.open(io.BytesIO(data))
+    if image.width * image.height > MAX_PIXELS:
+        raise ImageTooLargeError(f"Image has more than {MAX_PIXELS:,} pixels.")
+
+    scale = min(1.0, max_dimension / max(image.size))
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] and dpi[0] > target_dpi:
+        scale = min(scale, target_dpi / float(dpi[0]))
+
+    target_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    mode = "L" if grayscale else "RGB"
+
+    # For JPEGs, draft() lets the decoder skip straight to a reduced size
+    image.draft(mode, target_size)
+    image = ImageOps.exif_transpose(image).convert(mode)
+
+    if scale < 1.0:
+        # A square box fits the longest side whether or not exif_transpose rotated the image
+        longest = max(target_size)
+        image.thumbnail((longest, longest), Image.Resampling.BILINEAR)
+
+    return np.asarray(image)
+
+
+def rasterise_pdf(data: bytes, dpi: int = TARGET_DPI, max_pages: Optional[int] = None) -> List[bytes]:
+    """
+    Render each PDF page to a grayscale PNG at `dpi`, ready for the OCR pool.
+    The page count is checked against `max_pages` before anything is rendered.
+    """
+    try:
+        import pymupdf
+    except ImportError:
+        raise RuntimeError("PDF support requires PyMuPDF (pip install pymupdf).")
+
+    pages = []
+    with pymupdf.open(stream=data, filetype="pdf") as document:
+        if max_pages is not None and document.page_count > max_pages:
+            raise TooManyPagesError(f"PDF has {document.page_count} pages; at most {max_pages} allowed.")
+        for page in document:
+            pixmap = page.get_pixmap(dpi=dpi, colorspace=pymupdf.csGRAY)
+            pages.append(pixmap.tobytes("png"))
+    return pages
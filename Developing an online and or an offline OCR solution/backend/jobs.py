@@ -0,0 +1,96 @@
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from models import PageResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Page:
+    filename: str
+    page: int
+    data: bytes
+
+
+@dataclass
+class Job:
+    id: str
+    total: int
+    created_at: float = field(default_factory=time.time)
+    results: List[PageResult] = field(default_factory=list)
+    # Each streaming client gets its own queue of finished pages
+    listeners: List[asyncio.Queue] = field(default_factory=list)
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return len(self.results) == self.total
+
+    def publish(self, result: PageResult):
+        self.results.append(result)
+        for queue in self.listeners:
+            queue.put_nowait(result)
+
+    async def stream(self):
+        """Yield already-finished pages, then each new page as it completes."""
+        queue = asyncio.Queue()
+        self.listeners.append(queue)
+        finished = list(self.results)
+        try:
+            for result in finished:
+                yield result
+            for _ in range(self.total - len(finished)):
+                yield await queue.get()
+        finally:
+            self.listeners.remove(queue)
+
+
+class JobStore:
+    """In-memory registry of batch OCR jobs, expired `ttl` seconds after creation."""
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}
+
+    def create(self, total: int) -> Job:
+        self._expire()
+        job = Job(id=uuid.uuid4().hex, total=total)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.done and j.created_at < cutoff]:
+            del self._jobs[job_id]
+
+
+async def run_job(job: Job, pages: List[Page], ocr_pool, engine: str):
+    """OCR every page concurrently; the pool's batch slots bound how many run at once."""
+
+    async def process(page: Page):
+        try:
+            result = await ocr_pool.extract(page.data, engine=engine, wait=True)
+            page_result = PageResult(
+                filename=page.filename,
+                page=page.page,
+                text=result.text,
+                success=True,
+                engine=result.engine,
+                queue_time_ms=result.queue_time_ms,
+                preprocess_time_ms=result.preprocess_time_ms,
+                inference_time_ms=result.inference_time_ms,
+                cached=result.cached,
+            )
+        except Exception as e:
+            logger.error(f"Batch job {job.id} failed on {page.filename} page {page.page}: {e}")
+            page_result = PageResult(filename=page.filename, page=page.page, text="", success=False, error=str(e))
+        job.publish(page_result)
+
+    await asyncio.gather(*(process(page) for page in pages))
@@ -1,11 +1,56 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from ocr_engine import OCREngine
-from models import OCRResponse
+from fastapi.responses import StreamingResponse
+from ocr_pool import OCRWorkerPool, QueueFullError, PoolClosedError
+from ocr_cache import OCRCache
+from image_utils import read_upload, rasterise_pdf, ImageTooLargeError, TooManyPagesError, TARGET_DPI, MAX_DIMENSION
+from jobs import JobStore, Page, run_job
+from ocr_engine import BACKENDS, ROUTING_ENGINE
+from models import OCRResponse, BatchJobResponse
 import os
-import aiofiles
 
-app = FastAPI(title="OCR Service API")
+# Result cache: in-memory LRU in front of an on-disk tier (set OCR_CACHE_DIR="" to disable disk)
+ocr_cache = OCRCache(
+    memory_entries=int(os.getenv("OCR_CACHE_ENTRIES", "1024")),
+    disk_dir=os.getenv("OCR_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ocr_cache")),
+    disk_max_bytes=int(os.getenv("OCR_CACHE_MAX_MB", "500")) * 1024 * 1024,
+)
+
+# Everything that changes OCR output for the same bytes must be part of the cache key
+# (the engine itself is added per request)
+OCR_CONFIG = {
+    "languages": ["en"],
+    "target_dpi": TARGET_DPI,
+    "max_dimension": MAX_DIMENSION,
+    "grayscale": True,
+}
+
+# OCR worker pool; each worker process loads every backend once, so inference never blocks the event loop.
+# Requests pick a backend by name, or "auto" to route clean scans to Tesseract and photos to EasyOCR.
+DEFAULT_ENGINE = os.getenv("OCR_DEFAULT_ENGINE", ROUTING_ENGINE)
+ocr_pool = OCRWorkerPool(
+    workers=int(os.getenv("OCR_WORKERS", "2")),
+    max_queue=int(os.getenv("OCR_MAX_QUEUE", "8")),
+    # Admission places batch jobs may hold between them (default: one per worker)
+    batch_slots=int(os.getenv("OCR_BATCH_SLOTS", "0")) or None,
+    cache=ocr_cache,
+    cache_config=OCR_CONFIG,
+)
+
+# Batch jobs can be polled by id instead of holding the HTTP request open
+job_store = JobStore()
+MAX_BATCH_PAGES = int(os.getenv("OCR_MAX_BATCH_PAGES", "500"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ocr_pool.start()
+    yield
+    ocr_pool.shutdown()
+
+app = FastAPI(title="OCR Service API", lifespan=lifespan)
 
 # Add CORS middleware for the frontend
 app.add_middleware(
@@ -16,32 +61,109 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize OCR Engine (we will default to EasyOCR for offline initially)
-ocr_engine = OCREngine()
+def check_engine(engine: str):
+    if engine != ROUTING_ENGINE and engine not in BACKENDS:
+        options = ", ".join([ROUTING_ENGINE, *BACKENDS])
+        raise HTTPException(status_code=400, detail=f"Unknown engine '{engine}'. Choose one of: {options}.")
 
 @app.post("/api/extract", response_model=OCRResponse)
-async def extract_text(file: UploadFile = File(...)):
+async def extract_text(file: UploadFile = File(...), engine: str = Form(DEFAULT_ENGINE)):
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File provided is not an image.")
-    
-    # Save uploaded file temporarily
-    temp_file_path = f"temp_{file.filename}"
+    check_engine(engine)
+
     try:
-        async with aiofiles.open(temp_file_path, 'wb') as out_file:
-            content = await file.read()
-            await out_file.write(content)
-        
-        # Process the image
-        extracted_text = ocr_engine.extract(temp_file_path)
-        
-        return OCRResponse(filename=file.filename, text=extracted_text, success=True)
+        # Read the upload into memory (no temp file); it is decoded in the worker
+        content = await read_upload(file)
+
+        # Process the image in the worker pool
+        result = await ocr_pool.extract(content, engine=engine)
+
+        return OCRResponse(
+            filename=file.filename,
+            text=result.text,
+            success=True,
+            engine=result.engine,
+            queue_time_ms=result.queue_time_ms,
+            preprocess_time_ms=result.preprocess_time_ms,
+            inference_time_ms=result.inference_time_ms,
+            cached=result.cached,
+        )
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except PoolClosedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         return OCRResponse(filename=file.filename, text="", success=False, error=str(e))
-    finally:
-        # Cleanup temporary file
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+
+@app.post("/api/extract/batch", status_code=202)
+async def extract_batch(files: List[UploadFile] = File(...), engine: str = Form(DEFAULT_ENGINE),
+                        stream: bool = False):
+    """
+    OCR many images and/or PDFs (rasterised page by page) across the worker pool.
+
+    With `stream=true` the response is NDJSON: a job header line, then one
+    line per page in completion order. Otherwise the job id is returned
+    immediately and results are polled from /api/jobs/{job_id}.
+    """
+    check_engine(engine)
+    pages = []
+    try:
+        for file in files:
+            content = await read_upload(file)
+            if file.content_type == "application/pdf":
+                rendered = await asyncio.to_thread(rasterise_pdf, content, max_pages=MAX_BATCH_PAGES - len(pages))
+                pages.extend(Page(file.filename, i + 1, data) for i, data in enumerate(rendered))
+            elif file.content_type.startswith("image/"):
+                pages.append(Page(file.filename, 1, content))
+            else:
+                raise HTTPException(status_code=400, detail=f"{file.filename} is not an image or PDF.")
+
+            if len(pages) > MAX_BATCH_PAGES:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_PAGES} pages.")
+    except TooManyPagesError:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_PAGES} pages.")
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = job_store.create(total=len(pages))
+    job.task = asyncio.create_task(run_job(job, pages, ocr_pool, engine))
+
+    if stream:
+        async def page_lines():
+            yield BatchJobResponse(job_id=job.id, status="running", total_pages=job.total,
+                                   completed_pages=len(job.results)).model_dump_json() + "\n"
+            async for result in job.stream():
+                yield result.model_dump_json() + "\n"
+
+        return StreamingResponse(page_lines(), media_type="application/x-ndjson")
+
+    return BatchJobResponse(job_id=job.id, status="running", total_pages=job.total, completed_pages=0)
+
+@app.get("/api/jobs/{job_id}", response_model=BatchJobResponse)
+async def get_job(job_id: str):
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    return BatchJobResponse(
+        job_id=job.id,
+        status="done" if job.done else "running",
+        total_pages=job.total,
+        completed_pages=len(job.results),
+        pages=sorted(job.results, key=lambda r: (r.filename, r.page)),
+    )
 
 @app.get("/api/status")
 def status():
-    return {"status": "ok", "engine": "EasyOCR (Offline)"}
+    return {
+        "status": "ok",
+        "engine": " + ".join(BACKENDS[name].display_name for name in ocr_pool.engines) + " (Offline)",
+        "default_engine": DEFAULT_ENGINE,
+        "pool": ocr_pool.stats(),
+        "cache": ocr_cache.stats(),
+    }
@@ -1,8 +1,23 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class OCRResponse(BaseModel):
     filename: str
     text: str
     success: bool
     error: Optional[str] = None
+    engine: Optional[str] = None
+    queue_time_ms: Optional[float] = None
+    preprocess_time_ms: Optional[float] = None
+    inference_time_ms: Optional[float] = None
+    cached: bool = False
+
+class PageResult(OCRResponse):
+    page: int
+
+class BatchJobResponse(BaseModel):
+    job_id: str
+    status: str
+    total_pages: int
+    completed_pages: int
+    pages: List[PageResult] = []
@@ -0,0 +1,146 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """
+    Content-addressed cache of OCR results.
+
+    Keys are the SHA-256 of the image bytes plus a hash of the engine
+    configuration, so a change of engine, language or pre-processing never
+    returns a stale result. Lookups go memory LRU -> disk -> miss; disk hits
+    are promoted to memory. The disk tier is a directory of small text files
+    trimmed least-recently-used first once it exceeds `disk_max_bytes`.
+
+    Memory lookups run on the event loop; disk reads and writes run in a
+    worker thread. The directory is scanned once at startup, after which its
+    size and LRU order are tracked in memory.
+    """
+
+    def __init__(self, memory_entries: int = 1024, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 500 * 1024 * 1024):
+        self.memory_entries = memory_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        # key -> file size on disk, least recently used first
+        self._disk = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            files = [(entry.stat(), entry.name) for entry in os.scandir(disk_dir) if entry.name.endswith(".txt")]
+            for stat, name in sorted(files, key=lambda file: file[0].st_mtime):
+                self._disk[name[:-len(".txt")]] = stat.st_size
+                self._disk_bytes += stat.st_size
+
+    @staticmethod
+    def key(data: bytes, config: dict) -> str:
+        config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+        return f"{hashlib.sha256(data).hexdigest()}-{config_hash}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key]
+            on_disk = key in self._disk
+
+        if on_disk:
+            text = await asyncio.to_thread(self._read_disk, key)
+            if text is not None:
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                self._remember(key, text)
+                return text
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    async def put(self, key: str, text: str):
+        self._remember(key, text)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, text)
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                text = f.read()
+            os.utime(self._path(key))  # keeps the LRU order across restarts
+        except FileNotFoundError:
+            # Removed behind our back (another process, or by hand)
+            with self._lock:
+                self._disk_bytes -= self._disk.pop(key, 0)
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        return text
+
+    def _write_disk(self, key: str, text: str):
+        with self._lock:
+            if key in self._disk:
+                return
+        path = self._path(key)
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if key not in self._disk:
+                self._disk[key] = size
+                self._disk_bytes += size
+            over_limit = self._disk_bytes > self.disk_max_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        # Trim to 90% of the limit so we don't evict on every write
+        target = self.disk_max_bytes * 0.9
+        evicted = []
+        with self._lock:
+            while self._disk and self._disk_bytes > target:
+                key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evicted.append(key)
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        logger.info(f"OCR disk cache trimmed to {self._disk_bytes / 1e6:.1f} MB.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = sum(self._counters.values())
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            return {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+from image_utils import decode_image
+from ocr_cache import OCRCache
+
+logger = logging.getLogger(__name__)
+
+# Per-process OCR engine, created once by the pool initializer
+_engine = None
+
+
+def _init_worker(use_gpu: bool, threads: int):
+    """
+    Runs once in each worker process: pins the torch thread count so workers
+    don't oversubscribe the CPU, then loads the OCR model.
+    """
+    global _engine
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from ocr_engine import OCREngine
+    _engine = OCREngine(use_gpu=use_gpu)
+
+
+def _warm_up():
+    return os.getpid(), list(_engine.backends)
+
+
+def _run_ocr(data: bytes, engine: str, submitted_at: float):
+    # Raw upload bytes are cheaper to ship to the worker than a decoded array,
+    # and decoding there keeps that CPU work off the event loop too
+    started_at = time.time()
+    image = decode_image(data)
+    decoded_at = time.time()
+    text, engine_used = _engine.extract(image, engine)
+    return text, engine_used, started_at - submitted_at, decoded_at - started_at, time.time() - decoded_at
+
+
+class QueueFullError(Exception):
+    """Raised when the pool already holds `workers + max_queue` requests."""
+
+
+class PoolClosedError(Exception):
+    """Raised when a request arrives before start() or after shutdown()."""
+
+
+@dataclass
+class OCRResult:
+    text: str
+    engine: Optional[str] = None
+    queue_time_ms: float = 0.0
+    preprocess_time_ms: float = 0.0
+    inference_time_ms: float = 0.0
+    cached: bool = False
+
+
+class OCRWorkerPool:
+    """
+    Process pool of pre-initialised OCR readers.
+
+    EasyOCR is CPU-bound, so inference runs in separate processes and the
+    event loop only awaits the result. Admission is bounded: at most
+    `workers` requests run and `max_queue` wait; beyond that callers either
+    get a QueueFullError (HTTP 429) or, with `wait=True`, wait for a slot.
+    Waiting (batch) requests may hold at most `batch_slots` of those places,
+    so a large batch job never crowds out interactive requests.
+    Once the pool is shut down every request gets a PoolClosedError (HTTP 503).
+    Results are looked up in `cache` (keyed on the image bytes and
+    `cache_config`) before a request is admitted at all.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, batch_slots: Optional[int] = None,
+                 use_gpu: bool = False, cache: Optional[OCRCache] = None, cache_config: Optional[dict] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        # Enough to keep every worker busy, leaving the queue to interactive requests
+        self.batch_slots = batch_slots or workers
+        self.use_gpu = use_gpu
+        self.cache = cache
+        self.cache_config = cache_config or {}
+        self._executor = None
+        self._slots = None
+        self._batch_slots = None
+        self._in_flight = 0
+        self.engines = []
+
+    def start(self):
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        # Spawn rather than fork: torch is not fork-safe once initialised
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.use_gpu, threads),
+        )
+        self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+        self._batch_slots = asyncio.Semaphore(self.batch_slots)
+
+        # Start every worker now so the model loads happen at boot, not on the first request
+        warm_ups = [f.result() for f in [self._executor.submit(_warm_up) for _ in range(self.workers)]]
+        self.engines = warm_ups[0][1]
+        logger.info(f"OCR worker pool started with {len({pid for pid, _ in warm_ups})} workers "
+                    f"and backends: {', '.join(self.engines)}.")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def extract(self, data: bytes, engine: str = "auto", wait: bool = False) -> OCRResult:
+        if self._executor is None:
+            raise PoolClosedError("OCR worker pool is not running.")
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = OCRCache.key(data, {**self.cache_config, "engine": engine})
+            hit = await self.cache.get(cache_key)
+            if hit is not None:
+                return OCRResult(**json.loads(hit), cached=True)
+
+        if not wait and self._slots.locked():
+            raise QueueFullError("OCR queue is full, retry later.")
+
+        async with self._admission(batch=wait):
+            # The pool may have been shut down while this request waited for a slot;
+            # run_in_executor(None, ...) would run OCR in a thread with no engine loaded
+            executor = self._executor
+            if executor is None:
+                raise PoolClosedError("OCR worker pool is not running.")
+            self._in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                text, engine_used, queue_s, preprocess_s, inference_s = await loop.run_in_executor(
+                    executor, _run_ocr, data, engine, time.time()
+                )
+            finally:
+                self._in_flight -= 1
+
+        if cache_key is not None:
+            await self.cache.put(cache_key, json.dumps({"text": text, "engine": engine_used}))
+
+        return OCRResult(
+            text=text,
+            engine=engine_used,
+            queue_time_ms=queue_s * 1000,
+            preprocess_time_ms=preprocess_s * 1000,
+            inference_time_ms=inference_s * 1000,
+        )
+
+    @asynccontextmanager
+    async def _admission(self, batch: bool):
+        if batch:
+            async with self._batch_slots, self._slots:
+                yield
+        else:
+            async with self._slots:
+                yield
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "batch_slots": self.batch_slots,
+            "in_flight": self._in_flight,
+            "engines": self.engines,
+        }
@@ -0,0 +1,141 @@
+import io
+import csv
+import json
+import codecs
+from typing import AsyncIterator, Dict, List, Tuple
+from fastapi import Request
+from pydantic import ValidationError
+from sqlalchemy import insert
+import models, schemas
+from database import engine
+
+BATCH_SIZE = 5000
+# Invalid rows are all counted, but only the first ones are echoed back
+MAX_REPORTED_ERRORS = 1000
+
+# ==========================================
+# Parsing: JSON array, NDJSON or CSV bodies
+# ==========================================
+async def _lines(request: Request) -> AsyncIterator[str]:
+    """Decode the request body into lines as it streams in."""
+    # Incremental decoding: a chunk boundary can fall inside a multi-byte character
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+async def _ndjson_records(request: Request) -> AsyncIterator[Tuple[int, object]]:
+    row = 0
+    async for line in _lines(request):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row, ValueError(f"Invalid JSON: {e.msg}")
+
+async def _csv_records(request: Request) -> AsyncIterator[Tuple[int, object]]:
+    header, pending, row = None, "", 0
+    async for line in _lines(request):
+        # A quoted field can contain newlines: wait until the quotes balance
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        fields = next(csv.reader(io.StringIO(pending)), [])
+        pending = ""
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+        if not fields:
+            continue
+        row += 1
+        if len(fields) != len(header):
+            yield row, ValueError(f"Expected {len(header)} columns, got {len(fields)}")
+            continue
+        record = dict(zip(header, fields))
+        # CSV has no null; treat an empty description as missing
+        if record.get("description") == "":
+            record["description"] = None
+        yield row, record
+
+async def _json_records(request: Request) -> AsyncIterator[Tuple[int, object]]:
+    # A JSON array can't be parsed incrementally with the stdlib, so it is read whole
+    payload = json.loads(await request.body())
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array of items.")
+    for row, record in enumerate(payload, 1):
+        yield row, record
+
+def records_for(request: Request) -> AsyncIterator[Tuple[int, object]]:
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/ndjson"):
+        return _ndjson_records(request)
+    if content_type == "text/csv":
+        return _csv_records(request)
+    if content_type == "application/json":
+        return _json_records(request)
+    raise ValueError(f"Unsupported content type: {content_type}")
+
+# ==========================================
+# Validation and loading
+# ==========================================
+def _describe(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'item'}: {e['msg']}" for e in error.errors())
+
+async def _load(rows: List[Dict[str, object]]):
+    """Insert one batch in its own transaction: COPY on Postgres, a multi-row INSERT elsewhere."""
+    async with engine.begin() as conn:
+        if conn.dialect.driver == "asyncpg":
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                models.Item.__tablename__,
+                records=[(r["name"], r["description"]) for r in rows],
+                columns=["name", "description"],
+            )
+        else:
+            await conn.execute(insert(models.Item), rows)
+
+async def ingest(records: AsyncIterator[Tuple[int, object]], batch_size: int = BATCH_SIZE) -> schemas.BulkResult:
+    """
+    Validate records with ItemCreate and load the valid ones batch by batch.
+    Each batch commits on its own, so a failure part-way keeps earlier batches
+    and memory stays bounded by one batch regardless of upload size.
+    """
+    result = schemas.BulkResult(received=0, inserted=0, failed=0, errors=[])
+    batch: List[Dict[str, object]] = []
+
+    def reject(row: int, message: str):
+        result.failed += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(schemas.BulkError(row=row, error=message))
+
+    async for row, record in records:
+        result.received += 1
+        if isinstance(record, Exception):
+            reject(row, str(record))
+            continue
+        if not isinstance(record, dict):
+            reject(row, "Expected an object.")
+            continue
+        try:
+            item = schemas.ItemCreate(**record)
+        except ValidationError as e:
+            reject(row, _describe(e))
+            continue
+        batch.append({"name": item.name, "description": item.description})
+        if len(batch) >= batch_size:
+            await _load(batch)
+            result.inserted += len(batch)
+            batch = []
+
+    if batch:
+        await _load(batch)
+        result.inserted += len(batch)
+    return result
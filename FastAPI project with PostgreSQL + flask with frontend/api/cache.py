@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+# Optional shared tier, e.g. redis://redis:6379/0; anything speaking the Redis protocol works
+REDIS_URL = os.getenv("REDIS_URL", "")
+
+GENERATION_KEY = "items:generation"
+
+# A cached response: (JSON body, extra headers, ETag)
+Entry = Tuple[bytes, Dict[str, str], str]
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+class ResponseCache:
+    """
+    Read-through cache for serialised item responses.
+
+    Lookups go to an in-process TTL/LRU first, then to the optional shared
+    Redis tier. Keys embed a generation number, and invalidation simply bumps
+    it (INCR in Redis), so every worker stops reading stale entries at once
+    without deleting anything. Old entries age out through TTL and LRU.
+    Without Redis the generation is per process, so other workers may serve
+    stale lists for up to the TTL.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES, shared=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self._local: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()
+        self._generation = 0
+        self.counters = {"local_hits": 0, "shared_hits": 0, "misses": 0, "invalidations": 0}
+
+        if shared is None and REDIS_URL:
+            import redis.asyncio as redis
+            self.shared = redis.from_url(REDIS_URL)
+
+    async def generation(self) -> int:
+        if self.shared is not None:
+            try:
+                self._generation = int(await self.shared.get(GENERATION_KEY) or 0)
+            except Exception as e:
+                logger.warning(f"Shared cache unavailable, using local generation: {e}")
+        return self._generation
+
+    async def key(self, path: str, params: Dict[str, str]) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return f"items:{await self.generation()}:{path}?{query}"
+
+    async def get(self, key: str) -> Optional[Entry]:
+        cached = self._local.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._local.move_to_end(key)
+            self.counters["local_hits"] += 1
+            return cached[1]
+
+        if self.shared is not None:
+            try:
+                raw = await self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                stored = json.loads(raw)
+                entry = (stored["body"].encode(), stored["headers"], stored["etag"])
+                self._remember(key, entry)
+                self.counters["shared_hits"] += 1
+                return entry
+
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, body: bytes, headers: Dict[str, str]) -> Entry:
+        entry = (body, headers, make_etag(body))
+        self._remember(key, entry)
+        if self.shared is not None:
+            try:
+                payload = json.dumps({"body": body.decode(), "headers": headers, "etag": entry[2]})
+                await self.shared.set(key, payload, ex=max(int(self.ttl), 1))
+            except Exception as e:
+                logger.warning(f"Shared cache write failed: {e}")
+        return entry
+
+    def _remember(self, key: str, entry: Entry):
+        self._local[key] = (time.monotonic() + self.ttl, entry)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def invalidate(self):
+        """Called after any write to items."""
+        self.counters["invalidations"] += 1
+        self._generation += 1
+        self._local.clear()
+        if self.shared is not None:
+            try:
+                self._generation = await self.shared.incr(GENERATION_KEY)
+            except Exception as e:
+                logger.warning(f"Shared cache invalidation failed: {e}")
+
+    def stats(self) -> dict:
+        return {**self.counters, "local_entries": len(self._local), "generation": self._generation}
+
+response_cache = ResponseCache()
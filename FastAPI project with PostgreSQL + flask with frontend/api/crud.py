@@ -0,0 +1,39 @@
+from typing import Optional
+from sqlalchemy import select, or_, func
+import models
+from database import engine
+
+def page_query(columns, after_id: Optional[int], limit: int, skip: int = 0):
+    """
+    Keyset pagination on the primary key: `after_id` is the last id of the
+    previous page, so any depth costs one index seek. `skip` (OFFSET) is kept
+    for old clients but scans and discards every skipped row.
+    """
+    query = select(*columns).order_by(models.Item.id).limit(limit)
+    if after_id is not None:
+        query = query.where(models.Item.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    return query
+
+def search_query(q: str, limit: int):
+    """Full-text match on name + description, or substring match on name, best matches first."""
+    item = models.Item
+    if engine.dialect.name != "postgresql":
+        # SQLite stand-in: no search indexes, plain substring scan
+        return (
+            select(item.id, item.name)
+            .where(or_(item.name.icontains(q, autoescape=True), item.description.icontains(q, autoescape=True)))
+            .order_by(item.id)
+            .limit(limit)
+        )
+
+    document = models.search_document(item.name, item.description)
+    ts_query = func.websearch_to_tsquery(models.SEARCH_CONFIG, q)
+    return (
+        select(item.id, item.name)
+        # Both branches are index-backed: ix_items_search_tsv and ix_items_name_trgm
+        .where(or_(document.bool_op("@@")(ts_query), item.name.icontains(q, autoescape=True)))
+        .order_by(func.ts_rank(document, ts_query).desc(), item.id)
+        .limit(limit)
+    )
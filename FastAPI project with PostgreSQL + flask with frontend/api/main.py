@@ -1,22 +1,105 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-import models, schemas
-from database import engine, get_db
+import json
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+import models, schemas, crud, bulk
+from cache import response_cache
+from database import get_db
 
-# Create the database tables
-models.Base.metadata.create_all(bind=engine)
+# Tables are created by `python migrate.py` (run once before the server starts),
+# not at import time in every worker.
 
 app = FastAPI(title="FastAPI + Postgres Backend")
 
+def next_cursor(rows, limit: int) -> dict:
+    # A full page means there may be more; clients pass this back as after_id
+    return {"X-Next-Cursor": str(rows[-1].id)} if len(rows) == limit else {}
+
+def dump(schema, rows) -> bytes:
+    return json.dumps([schema.model_validate(row, from_attributes=True).model_dump(mode="json") for row in rows]).encode()
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+async def cached_response(request: Request, load) -> Response:
+    """
+    Serve a GET from the response cache, calling `load()` -> (body, headers)
+    only on a miss. Responses carry an ETag; a matching If-None-Match gets an
+    empty 304, so unchanged lists cost neither a query nor a body.
+    """
+    key = await response_cache.key(request.url.path, dict(request.query_params))
+    entry = await response_cache.get(key)
+    if entry is None:
+        entry = await response_cache.set(key, *await load())
+    body, headers, etag = entry
+    headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 @app.post("/items/", response_model=schemas.Item)
-def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
+async def create_item(item: schemas.ItemCreate, db: AsyncSession = Depends(get_db)):
     db_item = models.Item(name=item.name, description=item.description)
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    # The primary key is populated on flush, so no refresh round trip is needed
+    await db.commit()
+    await response_cache.invalidate()
     return db_item
 
+@app.post("/items/bulk", response_model=schemas.BulkResult)
+async def create_items_bulk(request: Request):
+    """
+    Load many items in one request. Send a JSON array (application/json),
+    one JSON object per line (application/x-ndjson) or CSV with a
+    name,description header (text/csv); NDJSON and CSV are read as they stream.
+    """
+    try:
+        result = await bulk.ingest(bulk.records_for(request))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        # Batches commit as they go, so even a failed upload may have added rows
+        await response_cache.invalidate()
+    return result
+
 @app.get("/items/", response_model=list[schemas.Item])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = db.query(models.Item).offset(skip).limit(limit).all()
-    return items
+async def read_items(request: Request, after_id: Optional[int] = None, skip: int = 0,
+                     limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_db)):
+    async def load():
+        result = await db.execute(crud.page_query([models.Item], after_id, limit, skip))
+        items = result.scalars().all()
+        return dump(schemas.Item, items), next_cursor(items, limit)
+    return await cached_response(request, load)
+
+@app.get("/items/summary", response_model=list[schemas.ItemSummary])
+async def read_item_summaries(request: Request, after_id: Optional[int] = None,
+                              limit: int = Query(100, ge=1, le=1000), db: AsyncSession = Depends(get_db)):
+    async def load():
+        result = await db.execute(crud.page_query([models.Item.id, models.Item.name], after_id, limit))
+        rows = result.all()
+        return dump(schemas.ItemSummary, rows), next_cursor(rows, limit)
+    return await cached_response(request, load)
+
+@app.get("/items/search", response_model=list[schemas.ItemSummary])
+async def search_items(request: Request, q: str = Query(..., min_length=2, max_length=200),
+                       limit: int = Query(20, ge=1, le=100), db: AsyncSession = Depends(get_db)):
+    async def load():
+        result = await db.execute(crud.search_query(q, limit))
+        return dump(schemas.ItemSummary, result.all()), {}
+    return await cached_response(request, load)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return response_cache.stats()
+
+# Declared last so /items/summary and /items/search aren't taken as item ids
+@app.get("/items/{item_id}", response_model=schemas.Item)
+async def read_item(request: Request, item_id: int, db: AsyncSession = Depends(get_db)):
+    async def load():
+        item = await db.get(models.Item, item_id)
+        if item is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return json.dumps(schemas.Item.model_validate(item, from_attributes=True).model_dump(mode="json")).encode(), {}
+    return await cached_response(request, load)
@@ -0,0 +1,36 @@
+"""
+Create the database schema.
+
+Run once per deployment, before the API workers start:
+
+    python migrate.py
+"""
+import asyncio
+from sqlalchemy import text
+import models
+from database import engine
+
+# B-tree indexes on the free-text columns from the original schema; replaced by
+# the full-text and trigram indexes in models.py
+LEGACY_INDEXES = ["ix_items_name", "ix_items_description"]
+
+def create_indexes(sync_conn):
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+async def migrate():
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for index in LEGACY_INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        await conn.run_sync(models.Base.metadata.create_all)
+        # create_all skips existing tables along with their indexes, so indexes
+        # added to an existing table have to be created one by one
+        await conn.run_sync(create_indexes)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
+    print("Database schema is up to date.")
@@ -1,9 +1,36 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index, func, literal_column
+# Registers the typed full-text functions (to_tsvector etc.) used below
+import sqlalchemy.dialects.postgresql  # noqa: F401
 from database import Base
 
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+def search_document(name, description):
+    """
+    to_tsvector over name + description. Every constant is rendered inline so
+    queries produce exactly the indexed expression; bound parameters would
+    stop Postgres from matching it to ix_items_search_tsv.
+    """
+    empty = literal_column("''")
+    return func.to_tsvector(
+        SEARCH_CONFIG,
+        func.coalesce(name, empty) + literal_column("' '") + func.coalesce(description, empty),
+    )
+
 class Item(Base):
     __tablename__ = "items"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
-    description = Column(String, index=True)
+    # No B-tree indexes on the free-text columns: nothing looks them up by exact
+    # value. Search goes through the Postgres-only indexes below instead.
+    name = Column(String)
+    description = Column(String)
+
+    __table_args__ = (
+        # Full-text search over name + description
+        Index("ix_items_search_tsv", search_document(name, description),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Trigram index so substring / fuzzy matches on name (ILIKE '%q%') avoid a table scan
+        Index("ix_items_name_trgm", name, postgresql_using="gin",
+              postgresql_ops={"name": "gin_trgm_ops"}).ddl_if(dialect="postgresql"),
+    )
@@ -13,3 +13,21 @@ class Item(ItemBase):
 
     class Config:
         orm_mode = True
+
+class ItemSummary(BaseModel):
+    """Slim projection for lists and search results: no description column is read."""
+    id: int
+    name: str
+
+    class Config:
+        orm_mode = True
+
+class BulkError(BaseModel):
+    row: int
+    error: str
+
+class BulkResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: list[BulkError]
@@ -1,36 +1,187 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import Flask, render_template, request, redirect, url_for
 
 app = Flask(__name__)
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 
+# (connect, read) timeouts in seconds, so a stalled API can't hang a page
+API_TIMEOUT = (float(os.getenv("API_CONNECT_TIMEOUT", "2")), float(os.getenv("API_READ_TIMEOUT", "5")))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))
+# The item list is refetched in the background once older than this; a failed
+# fetch isn't retried until this long after the attempt either
+ITEMS_FRESH_SECONDS = float(os.getenv("ITEMS_FRESH_SECONDS", "5"))
+# Items whose creation failed are shown with the error for this long
+FAILED_ITEM_SECONDS = float(os.getenv("FAILED_ITEM_SECONDS", "300"))
+
+# ==========================================
+# Shared HTTP session
+# ==========================================
+def make_session() -> requests.Session:
+    """
+    One keep-alive connection pool for all requests to the API. Connection
+    failures are retried for every method (nothing reached the server), but
+    only GETs are retried on read errors and 502/503/504, since repeating a
+    POST could create the item twice.
+    """
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=2,
+        status=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+api = make_session()
+# Item creation and list refreshes run here so the request thread can respond straight away
+background = ThreadPoolExecutor(max_workers=4, thread_name_prefix="api")
+
+# ==========================================
+# Stale-while-revalidate item list
+# ==========================================
+class ItemListCache:
+    """
+    Keeps the last item list from the API. A fresh copy is served as is; a
+    stale one, however old, is served while a single background refresh
+    runs, with a notice if the API is failing. Only the very first page
+    waits for the API, and concurrent first requests share that one fetch.
+    Refreshes send the API's ETag, so an unchanged list comes back as an
+    empty 304.
+    """
+
+    def __init__(self, fresh_for: float = ITEMS_FRESH_SECONDS):
+        self.fresh_for = fresh_for
+        self.items = None
+        self.etag = None
+        self.fetched_at = 0.0
+        # Updated on failures too, so a down API is retried every fresh_for seconds, not on every page
+        self.attempted_at = float("-inf")
+        self.error = None
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self):
+        """Return (items, error), waiting on the API only if no list has been received yet."""
+        if self.items is None:
+            self._initial_fetch()
+        elif self._due(self.fetched_at):
+            self.refresh_in_background()
+        return self.items or [], self.error
+
+    def _due(self, since: float) -> bool:
+        now = time.monotonic()
+        return now - since > self.fresh_for and now - self.attempted_at > self.fresh_for
+
+    def _initial_fetch(self):
+        with self._fetch_lock:
+            # Another request may have fetched (or just failed) while we waited
+            if self.items is None and self._due(float("-inf")):
+                self.refresh()
+
+    def refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        background.submit(self._background_refresh)
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def refresh(self):
+        headers = {"If-None-Match": self.etag} if self.etag else {}
+        try:
+            response = api.get(f"{API_URL}/items/", headers=headers, timeout=API_TIMEOUT)
+            if response.status_code == 200:
+                self.items = response.json()
+                self.etag = response.headers.get("ETag")
+            elif response.status_code != 304:
+                raise requests.exceptions.HTTPError(f"API returned {response.status_code}")
+            self.fetched_at = time.monotonic()
+            self.error = None
+        except requests.exceptions.RequestException as e:
+            print(f"Error communicating with API: {e}")
+            self.error = "The API is not responding" + ("; showing the last items we received." if self.items is not None else ".")
+        finally:
+            self.attempted_at = time.monotonic()
+
+item_cache = ItemListCache()
+
+# Items submitted from this process whose POST hasn't finished yet, and
+# those whose POST failed (shown with the error for FAILED_ITEM_SECONDS)
+pending_items = {}
+failed_items = {}
+pending_lock = threading.Lock()
+
+def create_item(key: int, payload: dict):
+    try:
+        response = api.post(f"{API_URL}/items/", json=payload, timeout=API_TIMEOUT)
+        response.raise_for_status()
+        item_cache.refresh()
+    except requests.exceptions.RequestException as e:
+        print(f"Error communicating with API: {e}")
+        with pending_lock:
+            failed_items[key] = {**payload, "error": describe_failure(e), "failed_at": time.monotonic()}
+    finally:
+        with pending_lock:
+            pending_items.pop(key, None)
+
+def describe_failure(error: requests.exceptions.RequestException) -> str:
+    response = getattr(error, "response", None)
+    if response is None:
+        return "The API is not responding."
+    try:
+        detail = response.json().get("detail")
+    except ValueError:
+        detail = None
+    # FastAPI validation errors carry a list here rather than a message
+    return detail if isinstance(detail, str) else f"The API returned {response.status_code}."
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if request.method == "POST":
-        # Handle form submission to create a new item
+        # Handle form submission to create a new item. The API call runs in
+        # the background and the browser is redirected immediately.
         name = request.form.get("name")
         description = request.form.get("description")
-        
+
         if name:
-            try:
-                requests.post(f"{API_URL}/items/", json={"name": name, "description": description})
-            except requests.exceptions.RequestException as e:
-                print(f"Error communicating with API: {e}")
-                
+            payload = {"name": name, "description": description}
+            key = time.monotonic_ns()
+            with pending_lock:
+                pending_items[key] = payload
+            background.submit(create_item, key, payload)
+
         return redirect(url_for("index"))
 
     # Fetch existing items to display
-    items = []
-    try:
-        response = requests.get(f"{API_URL}/items/")
-        if response.status_code == 200:
-            items = response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error communicating with API: {e}")
+    items, api_error = item_cache.get()
+    with pending_lock:
+        cutoff = time.monotonic() - FAILED_ITEM_SECONDS
+        for key in [key for key, item in failed_items.items() if item["failed_at"] < cutoff]:
+            del failed_items[key]
+        pending = list(pending_items.values())
+        failed = list(failed_items.values())
 
-    return render_template("index.html", items=items)
+    return render_template("index.html", items=items, pending=pending, failed=failed, api_error=api_error)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
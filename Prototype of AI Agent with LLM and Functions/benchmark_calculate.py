@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: the old eval-based calculate vs the AST evaluator.
+
+Measures per-expression cost for a mix of typical tool-call expressions
+(eval, AST cold compile, AST with the compile cache) and per-element cost
+when one expression is evaluated over a list of inputs.
+
+    python benchmark_calculate.py --repeat 20000 --inputs 100000
+"""
+import math
+import time
+import argparse
+from safe_eval import compile_expression, evaluate, evaluate_many
+
+EXPRESSIONS = [
+    "2 + 2",
+    "5 * 10",
+    "(17.5 - 3) / 4",
+    "2 ** 32 - 1",
+    "sqrt(2) * pi",
+    "(1 + 0.05) ** 12 * 1000",
+]
+
+
+def eval_path(expression: str):
+    # The previous calculate implementation
+    return eval(expression, {"__builtins__": None}, {"sqrt": math.sqrt, "pi": math.pi})
+
+
+def time_per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(EXPRESSIONS[i % len(EXPRESSIONS)])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def cold_ast(expression: str):
+    compile_expression.cache_clear()
+    return evaluate(expression)
+
+
+def run_benchmark(repeat: int, inputs: int):
+    for expression in EXPRESSIONS:
+        assert abs(eval_path(expression) - evaluate(expression)) < 1e-9, expression
+
+    print(f"{'Scalar path':<28}{'us/call':>10}")
+    print(f"{'eval (previous)':<28}{time_per_call(eval_path, repeat):>10.2f}")
+    print(f"{'AST, no cache':<28}{time_per_call(cold_ast, repeat):>10.2f}")
+    evaluate(EXPRESSIONS[0])
+    print(f"{'AST, compile cache':<28}{time_per_call(evaluate, repeat):>10.2f}")
+
+    expression = "(1 + r) ** 12 * x - sqrt(x)"
+    xs = [float(i) for i in range(inputs)]
+    code = compile(expression, "<expr>", "eval")
+    math_env = {"__builtins__": None, "sqrt": math.sqrt}
+
+    print(f"\n{'Over ' + str(inputs) + ' inputs':<28}{'ns/item':>10}")
+    start = time.perf_counter()
+    for x in xs:
+        eval(code, math_env, {"r": 0.01, "x": x})
+    print(f"{'eval loop (precompiled)':<28}{(time.perf_counter() - start) / inputs * 1e9:>10.1f}")
+
+    compiled = compile_expression(expression)
+    start = time.perf_counter()
+    for x in xs:
+        compiled({"r": 0.01, "x": x})
+    print(f"{'AST loop':<28}{(time.perf_counter() - start) / inputs * 1e9:>10.1f}")
+
+    start = time.perf_counter()
+    evaluate_many(expression, {"r": 0.01, "x": xs})
+    print(f"{'AST vectorised':<28}{(time.perf_counter() - start) / inputs * 1e9:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the calculate tool's evaluators")
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--inputs", type=int, default=100000)
+    args = parser.parse_args()
+    run_benchmark(args.repeat, args.inputs)
@@ -0,0 +1,162 @@
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    # tiktoken is optional; ~4 characters per token is close enough for budgeting
+    _ENCODING = None
+
+
+# ==========================================
+# Token counting
+# ==========================================
+def count_text_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def as_dict(message: Any) -> Dict[str, Any]:
+    """Chat messages are dicts, except assistant turns appended straight from the SDK."""
+    if isinstance(message, dict):
+        return message
+    return message.model_dump(exclude_none=True)
+
+
+def count_message_tokens(message: Dict[str, Any]) -> int:
+    # Each message carries a few tokens of role/formatting overhead
+    tokens = 4 + count_text_tokens(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call["function"]
+        tokens += count_text_tokens(function["name"]) + count_text_tokens(function["arguments"])
+    return tokens
+
+
+# ==========================================
+# Summarisation of evicted turns
+# ==========================================
+class LLMSummarizer:
+    """Folds evicted turns into a running summary with a cheap chat model."""
+
+    def __init__(self, client, model: str = "gpt-4o-mini", max_tokens: int = 300):
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def __call__(self, previous_summary: str, messages: List[Dict[str, Any]]) -> str:
+        lines = []
+        for message in messages:
+            if message.get("tool_calls"):
+                calls = ", ".join(f"{c['function']['name']}({c['function']['arguments']})" for c in message["tool_calls"])
+                lines.append(f"assistant called: {calls}")
+            else:
+                lines.append(f"{message['role']}: {message.get('content') or ''}")
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "Summarise the conversation so far for the assistant's own memory. Keep facts, numbers, names and open questions; drop pleasantries. Reply with the summary only."},
+                {"role": "user", "content": f"Summary so far:\n{previous_summary or '(none)'}\n\nNew messages:\n" + "\n".join(lines)},
+            ],
+            max_tokens=self.max_tokens,
+        )
+        return response.choices[0].message.content or previous_summary
+
+
+# ==========================================
+# History manager
+# ==========================================
+class HistoryManager:
+    """
+    Keeps the conversation as the system prompt plus a list of turns (a user
+    message and everything the assistant and tools added after it), and
+    builds the message list for each completion call under a token budget.
+
+    Turns are only ever evicted whole, oldest first, so an assistant tool-call
+    message is never separated from its tool results. Evicted turns are folded
+    into a running summary when a summarizer is configured and simply dropped
+    otherwise. Tool outputs outside the current turn are clipped to
+    `max_tool_tokens`, as the model has usually already used them.
+    """
+
+    def __init__(self, system_prompt: str, token_budget: int = 8000, keep_recent_turns: int = 4,
+                 max_tool_tokens: int = 500, summarizer: Optional[Callable[[str, List[Dict[str, Any]]], str]] = None):
+        self.system = {"role": "system", "content": system_prompt}
+        self.token_budget = token_budget
+        # The current turn can never be evicted
+        self.keep_recent_turns = max(keep_recent_turns, 1)
+        self.max_tool_tokens = max_tool_tokens
+        self.summarizer = summarizer
+        self.summary = ""
+        self.turns: List[List[Dict[str, Any]]] = []
+        self.dropped_turns = 0
+        self.tokens_per_call: List[int] = []
+
+    def add_user(self, content: str):
+        self.turns.append([{"role": "user", "content": content}])
+
+    def append(self, message: Any):
+        if not self.turns:
+            self.turns.append([])
+        self.turns[-1].append(as_dict(message))
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """Everything still held, uncompressed (excludes turns already summarised)."""
+        return [self.system] + [message for turn in self.turns for message in turn]
+
+    def _clip(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        content = message.get("content") or ""
+        if message["role"] != "tool" or count_text_tokens(content) <= self.max_tool_tokens:
+            return message
+        # Clip by characters at the ~4 chars/token ratio; exactness doesn't matter here
+        keep = self.max_tool_tokens * 4
+        return {**message, "content": f"{content[:keep]}... [truncated {len(content) - keep} characters]"}
+
+    def _summary_message(self) -> List[Dict[str, Any]]:
+        if not self.summary:
+            return []
+        return [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}]
+
+    def _window(self) -> List[Dict[str, Any]]:
+        older = [self._clip(m) for turn in self.turns[:-1] for m in turn]
+        return [self.system] + self._summary_message() + older + (self.turns[-1] if self.turns else [])
+
+    def build(self) -> List[Dict[str, Any]]:
+        """Messages to send for the next completion call; evicts old turns if over budget."""
+        evicted = []
+        window = self._window()
+        tokens = sum(count_message_tokens(m) for m in window)
+        while tokens > self.token_budget and len(self.turns) > self.keep_recent_turns:
+            turn = self.turns.pop(0)
+            evicted.extend(turn)
+            tokens -= sum(count_message_tokens(self._clip(m)) for m in turn)
+
+        if evicted:
+            # One summarisation call covers every turn evicted for this request
+            self.dropped_turns += len([m for m in evicted if m["role"] == "user"])
+            if self.summarizer is not None:
+                try:
+                    self.summary = self.summarizer(self.summary, evicted)
+                except Exception as e:
+                    # Losing the turns is better than failing the user's request
+                    print(f"\n[Warning] Failed to summarise old turns, dropping them: {e}")
+            window = self._window()
+            tokens = sum(count_message_tokens(m) for m in window)
+
+        self.tokens_per_call.append(tokens)
+        return window
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "turns": len(self.turns),
+            "dropped_turns": self.dropped_turns,
+            "summary_tokens": count_text_tokens(self.summary),
+            "last_call_tokens": self.tokens_per_call[-1] if self.tokens_per_call else 0,
+            "total_tokens_sent": sum(self.tokens_per_call),
+            "calls": len(self.tokens_per_call),
+        }
+
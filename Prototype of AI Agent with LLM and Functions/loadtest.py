@@ -0,0 +1,126 @@
+"""
+Load test for the multi-session agent server.
+
+By default starts the mock OpenAI server and the agent server as
+subprocesses, then runs many simulated users concurrently. Each creates a
+session and sends a few turns (alternating tool-using weather questions and
+plain questions) over the streaming HTTP endpoint. Reports sessions/sec,
+turn latency percentiles and time to first streamed event.
+
+    python loadtest.py --sessions 200 --concurrency 50 --turns 4
+    python loadtest.py --url http://127.0.0.1:8000   # against an already running server
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import httpx
+import numpy as np
+
+MOCK_PORT = 8100
+AGENT_PORT = 8101
+PROMPTS = [
+    "What's the weather in Tokyo?",
+    "Tell me something interesting.",
+    "And the weather in Paris?",
+    "Thanks, summarise that for me.",
+]
+
+
+def start_servers():
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{MOCK_PORT}/v1",
+        "OPENAI_API_KEY": "mock",
+    }
+    processes = [
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "mock_openai_server:app", "--port", str(MOCK_PORT),
+                          "--log-level", "warning"], cwd=here, env=env),
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "server:app", "--port", str(AGENT_PORT),
+                          "--log-level", "warning"], cwd=here, env=env, stdout=subprocess.DEVNULL),
+    ]
+    return processes, f"http://127.0.0.1:{AGENT_PORT}"
+
+
+async def wait_until_up(client: httpx.AsyncClient, url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            (await client.get(f"{url}/stats")).raise_for_status()
+            return
+        except httpx.HTTPError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Agent server at {url} did not come up")
+
+
+async def run_session(client: httpx.AsyncClient, url: str, turns: int, results: dict):
+    session_id = (await client.post(f"{url}/sessions")).json()["session_id"]
+    for turn in range(turns):
+        start = time.perf_counter()
+        first_event = None
+        async with client.stream("POST", f"{url}/sessions/{session_id}/chat",
+                                 json={"message": PROMPTS[turn % len(PROMPTS)]}) as response:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                event = json.loads(line)
+                if event["type"] == "error":
+                    results["errors"] += 1
+        results["turn_latency"].append(time.perf_counter() - start)
+        results["first_event"].append(first_event or 0.0)
+    await client.delete(f"{url}/sessions/{session_id}")
+
+
+async def run_load(url: str, sessions: int, concurrency: int, turns: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120.0) as client:
+        await wait_until_up(client, url)
+
+        results = {"turn_latency": [], "first_event": [], "errors": 0}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def user():
+            async with semaphore:
+                await run_session(client, url, turns, results)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(sessions)))
+        elapsed = time.perf_counter() - start
+        server_stats = (await client.get(f"{url}/stats")).json()
+
+    latency = np.array(results["turn_latency"]) * 1000
+    first_event = np.array(results["first_event"]) * 1000
+    print(f"Sessions:       {sessions} ({concurrency} concurrent, {turns} turns each)")
+    print(f"Elapsed:        {elapsed:.2f}s")
+    print(f"Sessions/sec:   {sessions / elapsed:.2f}")
+    print(f"Turns/sec:      {len(latency) / elapsed:.2f}")
+    print(f"Turn latency:   p50 {np.percentile(latency, 50):.1f} ms, p99 {np.percentile(latency, 99):.1f} ms")
+    print(f"First event:    p50 {np.percentile(first_event, 50):.1f} ms, p99 {np.percentile(first_event, 99):.1f} ms")
+    print(f"Errors:         {results['errors']}")
+    print(f"Server tools:   {json.dumps(server_stats['tools'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the multi-session agent server")
+    parser.add_argument("--url", help="Agent server to test; omit to start it (and the mock OpenAI server) locally")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=4)
+    args = parser.parse_args()
+
+    processes = []
+    url = args.url
+    if url is None:
+        processes, url = start_servers()
+    try:
+        asyncio.run(run_load(url, args.sessions, args.concurrency, args.turns))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
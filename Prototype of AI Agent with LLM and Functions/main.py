@@ -5,6 +5,9 @@ from typing import List, Dict, Any
 from dotenv import load_dotenv
 
 import openai
+from tool_runner import ToolRunner, memoize
+from history import HistoryManager, LLMSummarizer
+from safe_eval import evaluate, CalculationError
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +18,8 @@ load_dotenv()
 # ==========================================
 # 1. Define Local Functions (Tools)
 # ==========================================
+# Weather changes slowly, so identical lookups within 10 minutes reuse the last answer
+@memoize(ttl=600)
 def get_current_weather(location: str, unit: str = "celsius") -> str:
     """Get the current weather in a given location."""
     # This is a mock implementation.
@@ -31,16 +36,15 @@ def get_current_weather(location: str, unit: str = "celsius") -> str:
     else:
         return json.dumps({"location": location, "temperature": "20", "unit": unit, "forecast": "clear"})
 
-def calculate(expression: str) -> str:
+def calculate(expression: str, variables: Dict[str, Any] = None) -> str:
     """Perform a mathematical calculation."""
-    print(f"\n[Tool Executing] -> calculate(expression='{expression}')")
+    print(f"\n[Tool Executing] -> calculate(expression='{expression}', variables={variables})")
     try:
-        # NOTE: eval is dangerous in production! 
-        # Using it here just for a simple prototype demonstration.
-        # In reality, use a safe math parser or limit the characters.
-        result = eval(expression, {"__builtins__": None}, {})
-        return json.dumps({"result": str(result)})
-    except Exception as e:
+        # AST-based evaluator: arithmetic and math functions only, with size limits,
+        # so model-supplied input can't run code or hang the process (e.g. 9**9**9)
+        result = evaluate(expression, variables)
+        return json.dumps({"result": result if isinstance(result, list) else str(result)})
+    except CalculationError as e:
         return json.dumps({"error": str(e)})
 
 # Dictionary mapping function names to the actual python functions
@@ -49,6 +53,23 @@ AVAILABLE_FUNCTIONS = {
     "calculate": calculate
 }
 
+# Per-tool timeouts in seconds; tools not listed get ToolRunner's default
+TOOL_TIMEOUTS = {
+    "get_current_weather": 10.0,
+    "calculate": 2.0,
+}
+
+# Shared by every Agent so concurrent conversations reuse one thread pool
+tool_runner = ToolRunner(AVAILABLE_FUNCTIONS, timeouts=TOOL_TIMEOUTS)
+
+# Context window: older turns are summarised once a request would exceed the budget
+CONTEXT_TOKEN_BUDGET = int(os.getenv("AGENT_CONTEXT_TOKENS", "8000"))
+KEEP_RECENT_TURNS = int(os.getenv("AGENT_KEEP_RECENT_TURNS", "4"))
+MAX_TOOL_OUTPUT_TOKENS = int(os.getenv("AGENT_MAX_TOOL_OUTPUT_TOKENS", "500"))
+SUMMARY_MODEL = os.getenv("AGENT_SUMMARY_MODEL", "gpt-4o-mini")
+
+SYSTEM_PROMPT = "You are a helpful assistant. You have access to tools for getting weather and performing basic calculations. Use them when needed to answer the user's questions accurately."
+
 # ==========================================
 # 2. Define the Tool Schemas for OpenAI
 # ==========================================
@@ -85,8 +106,12 @@ TOOLS = [
                 "properties": {
                     "expression": {
                         "type": "string",
-                        "description": "The mathematical expression to evaluate, e.g. '2 + 2' or '5 * 10'",
-                    }
+                        "description": "The mathematical expression to evaluate, e.g. '2 + 2', '5 * 10' or 'sqrt(x) * 2'",
+                    },
+                    "variables": {
+                        "type": "object",
+                        "description": "Optional values for variables in the expression. A list of numbers evaluates the expression once per value and returns a list.",
+                    },
                 },
                 "required": ["expression"],
             },
@@ -98,23 +123,35 @@ TOOLS = [
 # 3. Define the Agent Logic
 # ==========================================
 class Agent:
-    def __init__(self, model: str = "gpt-4o"):
+    def __init__(self, model: str = "gpt-4o", runner: ToolRunner = tool_runner):
         self.client = openai.OpenAI()
         self.model = model
-        self.messages: List[Dict[str, Any]] = [
-            {"role": "system", "content": "You are a helpful assistant. You have access to tools for getting weather and performing basic calculations. Use them when needed to answer the user's questions accurately."}
-        ]
+        self.tool_runner = runner
+        self.history = HistoryManager(
+            SYSTEM_PROMPT,
+            token_budget=CONTEXT_TOKEN_BUDGET,
+            keep_recent_turns=KEEP_RECENT_TURNS,
+            max_tool_tokens=MAX_TOOL_OUTPUT_TOKENS,
+            summarizer=LLMSummarizer(self.client, SUMMARY_MODEL),
+        )
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        return self.history.messages
 
     def chat(self, user_input: str):
         # 1. Add user message to history
-        self.messages.append({"role": "user", "content": user_input})
+        self.history.add_user(user_input)
 
         while True:
             # 2. Call the LLM with current history and tools
             try:
+                # Only the budgeted window is sent, not the full history
+                messages = self.history.build()
+                print(f"\n[Context] {self.history.tokens_per_call[-1]} tokens sent (budget {self.history.token_budget})")
                 response = self.client.chat.completions.create(
                     model=self.model,
-                    messages=self.messages,
+                    messages=messages,
                     tools=TOOLS,
                     tool_choice="auto", # The model decides whether to call a tool or not
                 )
@@ -132,47 +169,32 @@ class Agent:
             if not tool_calls:
                 # No tools to call, the model generated a direct response.
                 # Add the response to history and return.
-                self.messages.append({"role": "assistant", "content": response_message.content})
+                self.history.append({"role": "assistant", "content": response_message.content})
                 print(f"\nAgent: {response_message.content}")
                 break
 
             # 4. If the model wants to call tools, handle them
             
             # The API requires us to append the assistant's tool-call request to the messages
-            self.messages.append(response_message)
+            self.history.append(response_message)
 
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                
-                # Check if we support this function locally
-                if function_name not in AVAILABLE_FUNCTIONS:
-                    print(f"\n[Warning] The model tried to call an unknown function: {function_name}")
-                    function_response = json.dumps({"error": f"Unknown function: {function_name}"})
-                else:
-                    function_to_call = AVAILABLE_FUNCTIONS[function_name]
-                    # Parse the arguments provided by the LLM
-                    try:
-                        function_args = json.loads(tool_call.function.arguments)
-                        # Execute the function
-                        function_response = function_to_call(**function_args)
-                    except json.JSONDecodeError:
-                        function_response = json.dumps({"error": "Failed to parse arguments."})
-                    except Exception as e:
-                        function_response = json.dumps({"error": str(e)})
+            # The calls in one turn are independent, so they run concurrently
+            function_responses = self.tool_runner.run(tool_calls)
 
+            for tool_call, function_response in zip(tool_calls, function_responses):
                 # 5. Append the function's response to the message history
                 # We specify the role as "tool" and provide the tool_call_id
-                self.messages.append(
+                self.history.append(
                     {
                         "tool_call_id": tool_call.id,
                         "role": "tool",
-                        "name": function_name,
+                        "name": tool_call.function.name,
                         "content": function_response,
                     }
                 )
             
             # The loop will naturally continue, and the agent will call the LLM again
-            # this time with the newly added tool responses in `self.messages`.
+            # this time with the newly added tool responses in the history.
 
 
 # ==========================================
@@ -185,7 +207,7 @@ if __name__ == "__main__":
          
     print("=====================================================")
     print("Welcome to the AI Agent Prototype (with function calling)")
-    print("Type 'exit' or 'quit' to end the conversation.")
+    print("Type 'exit' or 'quit' to end the conversation, 'stats' for tool latency and context usage.")
     print("=====================================================\n")
 
     agent = Agent()
@@ -199,6 +221,10 @@ if __name__ == "__main__":
             
             if not user_input.strip():
                 continue
+
+            if user_input.lower() == 'stats':
+                print(json.dumps({"tools": agent.tool_runner.stats(), "context": agent.history.stats()}, indent=2))
+                continue
                 
             agent.chat(user_input)
             
@@ -0,0 +1,88 @@
+"""
+Minimal OpenAI-compatible chat completions server for load testing.
+
+Answers questions mentioning "weather" with a get_current_weather tool call,
+then (once the tool result comes back) with a short streamed answer, and
+anything else with a streamed answer straight away. Latency is simulated
+with MOCK_TTFT_MS before the first chunk and MOCK_TOKEN_MS per token.
+
+    uvicorn mock_openai_server:app --port 8100
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock uvicorn server:app
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+TTFT_MS = float(os.getenv("MOCK_TTFT_MS", "50"))
+TOKEN_MS = float(os.getenv("MOCK_TOKEN_MS", "5"))
+
+app = FastAPI(title="Mock OpenAI")
+
+
+def plan_reply(messages):
+    """Returns (tool_call or None, answer text) for the conversation so far."""
+    last = messages[-1]
+    if last["role"] == "user" and "weather" in (last.get("content") or "").lower():
+        location = last["content"].rsplit(" in ", 1)[-1].strip(" ?.") or "Paris"
+        return {"name": "get_current_weather", "arguments": json.dumps({"location": location})}, ""
+    if last["role"] == "tool":
+        return None, f"According to the weather tool: {last['content']}"
+    return None, "This is a mock answer from the load-test server, streamed one word at a time."
+
+
+def chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    body = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(body)}\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "mock")
+    tool_call, answer = plan_reply(body["messages"])
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    call_id = f"call_{uuid.uuid4().hex[:12]}"
+
+    if not body.get("stream"):
+        await asyncio.sleep((TTFT_MS + TOKEN_MS * len(answer.split())) / 1000)
+        message = {"role": "assistant", "content": answer or None}
+        if tool_call:
+            message["tool_calls"] = [{"id": call_id, "type": "function", "function": tool_call}]
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_call else "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    async def stream():
+        await asyncio.sleep(TTFT_MS / 1000)
+        if tool_call:
+            # Split the arguments across two chunks, as the real API does
+            arguments = tool_call["arguments"]
+            half = len(arguments) // 2
+            yield chunk(completion_id, model, {"role": "assistant", "tool_calls": [
+                {"index": 0, "id": call_id, "type": "function", "function": {"name": tool_call["name"], "arguments": arguments[:half]}}
+            ]})
+            yield chunk(completion_id, model, {"tool_calls": [{"index": 0, "function": {"arguments": arguments[half:]}}]})
+            yield chunk(completion_id, model, {}, "tool_calls")
+        else:
+            for i, word in enumerate(answer.split(" ")):
+                yield chunk(completion_id, model, {"role": "assistant", "content": word if i == 0 else " " + word})
+                await asyncio.sleep(TOKEN_MS / 1000)
+            yield chunk(completion_id, model, {}, "stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
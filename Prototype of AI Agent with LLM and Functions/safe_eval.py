@@ -0,0 +1,209 @@
+import ast
+import math
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ==========================================
+# Limits
+# ==========================================
+MAX_EXPRESSION_LENGTH = 500
+MAX_NODES = 100
+MAX_EXPONENT = 10_000
+# Integer results above this many bits are refused (~3000 decimal digits)
+MAX_INT_BITS = 10_000
+
+
+class CalculationError(ValueError):
+    """Raised for expressions that are invalid, not allowed, or too expensive."""
+
+
+# ==========================================
+# Allowed operations
+# ==========================================
+def _check_int(value):
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise CalculationError(f"Result exceeds {MAX_INT_BITS} bits.")
+    return value
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_variables(variables: Dict[str, Any]):
+    """Variables reach the operators unchecked, so only numbers (or lists of them) are accepted."""
+    for name, value in variables.items():
+        values = value if isinstance(value, (list, tuple)) else (value,)
+        for item in values:
+            if not _is_number(item):
+                raise CalculationError(f"Variable {name} must be a number or a list of numbers.")
+            _check_int(item)
+
+
+def _check_result(value):
+    # e.g. (-8) ** 0.5 is a complex number
+    if not _is_number(value):
+        raise CalculationError("Result is not a real number.")
+    return value
+
+
+def _safe_pow(base, exponent):
+    # Checked before computing, so 9**9**9 fails instantly instead of hanging
+    if isinstance(base, int) and isinstance(exponent, int):
+        if abs(exponent) > MAX_EXPONENT or (abs(base) > 1 and base.bit_length() * exponent > MAX_INT_BITS):
+            raise CalculationError("Exponent too large.")
+    elif np is not None and isinstance(exponent, np.ndarray):
+        if np.abs(exponent).max(initial=0) > MAX_EXPONENT:
+            raise CalculationError("Exponent too large.")
+    elif isinstance(exponent, (int, float)) and abs(exponent) > MAX_EXPONENT:
+        raise CalculationError("Exponent too large.")
+    return base ** exponent
+
+
+def _safe_mul(a, b):
+    return _check_int(a * b)
+
+
+BINARY_OPERATORS: Dict[type, Callable] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _safe_mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _safe_pow,
+}
+
+UNARY_OPERATORS: Dict[type, Callable] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+# Scalar functions, and their element-wise numpy equivalents for vectorised evaluation
+FUNCTIONS = {
+    "abs": abs, "round": round, "min": min, "max": max,
+    "sqrt": math.sqrt, "exp": math.exp, "log": math.log, "log10": math.log10,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "floor": math.floor, "ceil": math.ceil,
+}
+if np is not None:
+    VECTOR_FUNCTIONS = {
+        "abs": np.abs, "round": np.round, "min": np.minimum, "max": np.maximum,
+        "sqrt": np.sqrt, "exp": np.exp, "log": np.log, "log10": np.log10,
+        "sin": np.sin, "cos": np.cos, "tan": np.tan,
+        "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+        "floor": np.floor, "ceil": np.ceil,
+    }
+
+
+# ==========================================
+# Compiler: AST -> tree of closures
+# ==========================================
+def _build(node: ast.AST, functions: Dict[str, Callable]) -> Callable[[Dict[str, Any]], Any]:
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise CalculationError(f"Unsupported constant: {node.value!r}")
+        value = _check_int(node.value)
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        if node.id in CONSTANTS:
+            value = CONSTANTS[node.id]
+            return lambda env: value
+        name = node.id
+
+        def lookup(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise CalculationError(f"Unknown variable: {name}") from None
+        return lookup
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        op = BINARY_OPERATORS[type(node.op)]
+        left, right = _build(node.left, functions), _build(node.right, functions)
+        return lambda env: op(left(env), right(env))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        op = UNARY_OPERATORS[type(node.op)]
+        operand = _build(node.operand, functions)
+        return lambda env: op(operand(env))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id not in functions:
+            raise CalculationError(f"Unknown function: {node.func.id}")
+        function = functions[node.func.id]
+        args = [_build(arg, functions) for arg in node.args]
+        return lambda env: function(*(arg(env) for arg in args))
+
+    raise CalculationError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str, vectorised: bool = False) -> Callable[[Dict[str, Any]], Any]:
+    """Parse, validate and compile an expression once; repeated expressions hit the cache."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculationError(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters.")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise CalculationError(f"Invalid expression: {e.msg}") from None
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise CalculationError(f"Expression has more than {MAX_NODES} operations.")
+    return _build(tree.body, VECTOR_FUNCTIONS if vectorised else FUNCTIONS)
+
+
+# ==========================================
+# Public API
+# ==========================================
+def evaluate(expression: str, variables: Optional[Dict[str, Any]] = None) -> Union[int, float, List[float]]:
+    """
+    Evaluate an arithmetic expression safely. If any variable is bound to a
+    list, the expression is evaluated once per element (broadcasting the
+    scalar variables) and a list is returned. Variables must be ints, floats
+    or lists of them, and results that are not real numbers are refused.
+    """
+    variables = variables or {}
+    if any(isinstance(value, (list, tuple)) for value in variables.values()):
+        return evaluate_many(expression, variables)
+    _check_variables(variables)
+    try:
+        return _check_result(compile_expression(expression)(variables))
+    except (ArithmeticError, TypeError, ValueError) as e:
+        if isinstance(e, CalculationError):
+            raise
+        raise CalculationError(str(e)) from None
+
+
+def evaluate_many(expression: str, variables: Dict[str, Any]) -> List[float]:
+    """Evaluate over lists of inputs: one numpy pass when available, else a loop over the compiled expression."""
+    _check_variables(variables)
+    lengths = {len(v) for v in variables.values() if isinstance(v, (list, tuple))}
+    if len(lengths) > 1:
+        raise CalculationError("All list variables must have the same length.")
+
+    if np is not None:
+        with np.errstate(all="ignore"):
+            try:
+                # Float64 can't hold every int _check_variables allows
+                arrays = {name: np.asarray(value, dtype=np.float64) for name, value in variables.items()}
+                result = compile_expression(expression, vectorised=True)(arrays)
+            except (ArithmeticError, TypeError, ValueError) as e:
+                if isinstance(e, CalculationError):
+                    raise
+                raise CalculationError(str(e)) from None
+        return np.broadcast_to(result, (lengths.pop(),)).tolist()
+
+    count = lengths.pop()
+    rows = [{name: value[i] if isinstance(value, (list, tuple)) else value for name, value in variables.items()}
+            for i in range(count)]
+    return [evaluate(expression, row) for row in rows]
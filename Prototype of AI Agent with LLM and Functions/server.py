@@ -0,0 +1,281 @@
+"""
+Multi-session agent server.
+
+Hosts many concurrent Agent conversations behind HTTP and WebSocket
+endpoints. All sessions share one AsyncOpenAI client (and so one pooled set
+of HTTP connections) and the module-level tool runner from main.py.
+Assistant tokens and tool-call events are streamed to the client as they
+happen.
+
+    uvicorn server:app --port 8000
+
+    POST   /sessions                 -> {"session_id": ...}
+    POST   /sessions/{id}/chat       {"message": ...} -> NDJSON event stream
+    WS     /sessions/{id}/ws         send {"message": ...}, receive JSON events
+    DELETE /sessions/{id}
+    GET    /stats
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import contextlib
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+import openai
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from main import (
+    TOOLS, SYSTEM_PROMPT, CONTEXT_TOKEN_BUDGET, KEEP_RECENT_TURNS,
+    MAX_TOOL_OUTPUT_TOKENS, SUMMARY_MODEL, tool_runner,
+)
+from history import HistoryManager, LLMSummarizer
+
+MODEL = os.getenv("AGENT_MODEL", "gpt-4o")
+MAX_CONNECTIONS = int(os.getenv("AGENT_MAX_CONNECTIONS", "100"))
+SESSION_IDLE_SECONDS = float(os.getenv("AGENT_SESSION_IDLE_SECONDS", "900"))
+MAX_SESSIONS = int(os.getenv("AGENT_MAX_SESSIONS", "10000"))
+# Guards against a model that keeps calling tools forever
+MAX_TOOL_ROUNDS = 8
+
+
+# ==========================================
+# 1. Async Agent (one per session)
+# ==========================================
+class AsyncAgent:
+    """
+    Asynchronous counterpart of main.Agent that streams its work as events:
+
+        {"type": "token", "content": ...}          assistant text as it is generated
+        {"type": "tool_call", "name", "arguments"}  before a tool runs
+        {"type": "tool_result", "name", "content"}  after it returns
+        {"type": "done", "content": ...}            the full final answer
+        {"type": "error", "error": ...}
+    """
+
+    def __init__(self, client: openai.AsyncOpenAI, summarizer=None, model: str = MODEL):
+        self.client = client
+        self.model = model
+        self.history = HistoryManager(
+            SYSTEM_PROMPT,
+            token_budget=CONTEXT_TOKEN_BUDGET,
+            keep_recent_turns=KEEP_RECENT_TURNS,
+            max_tool_tokens=MAX_TOOL_OUTPUT_TOKENS,
+            summarizer=summarizer,
+        )
+        # One turn at a time per session; other sessions are unaffected
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    async def chat(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        async with self.lock:
+            self.last_used = time.monotonic()
+            self.history.add_user(user_input)
+            try:
+                async for event in self._run_turn():
+                    yield event
+            except openai.APIError as e:
+                yield {"type": "error", "error": f"OpenAI API Error: {e}"}
+            finally:
+                self.last_used = time.monotonic()
+
+    async def _run_turn(self) -> AsyncIterator[Dict[str, Any]]:
+        for _ in range(MAX_TOOL_ROUNDS):
+            # Summarising evicted turns is a blocking call, so keep it off the event loop
+            messages = await asyncio.to_thread(self.history.build)
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                tools=TOOLS,
+                tool_choice="auto",
+                stream=True,
+            )
+
+            content: List[str] = []
+            tool_calls: Dict[int, Dict[str, Any]] = {}
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content.append(delta.content)
+                    yield {"type": "token", "content": delta.content}
+                # Tool calls arrive as fragments keyed by index; the arguments JSON is split across chunks
+                for fragment in delta.tool_calls or []:
+                    call = tool_calls.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+                    call["id"] = fragment.id or call["id"]
+                    if fragment.function:
+                        call["name"] += fragment.function.name or ""
+                        call["arguments"] += fragment.function.arguments or ""
+
+            if not tool_calls:
+                answer = "".join(content)
+                self.history.append({"role": "assistant", "content": answer})
+                yield {"type": "done", "content": answer}
+                return
+
+            calls = [tool_calls[index] for index in sorted(tool_calls)]
+            for c in calls:
+                yield {"type": "tool_call", "name": c["name"], "arguments": c["arguments"]}
+
+            # ToolRunner is thread-based and expects SDK-shaped tool calls
+            runner_calls = [
+                SimpleNamespace(id=c["id"], function=SimpleNamespace(name=c["name"], arguments=c["arguments"]))
+                for c in calls
+            ]
+            responses = await asyncio.to_thread(tool_runner.run, runner_calls)
+
+            # The assistant's tool_calls and every reply go into history together, with no
+            # await or yield in between: if the client disconnects mid-turn, history never
+            # holds tool_calls without their replies (which OpenAI rejects on every later turn)
+            self.history.append({
+                "role": "assistant",
+                "content": "".join(content) or None,
+                "tool_calls": [
+                    {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": c["arguments"]}}
+                    for c in calls
+                ],
+            })
+            for c, response in zip(calls, responses):
+                self.history.append({"tool_call_id": c["id"], "role": "tool", "name": c["name"], "content": response})
+            for c, response in zip(calls, responses):
+                yield {"type": "tool_result", "name": c["name"], "content": response}
+
+        yield {"type": "error", "error": f"Stopped after {MAX_TOOL_ROUNDS} rounds of tool calls."}
+
+
+# ==========================================
+# 2. Session Registry
+# ==========================================
+class SessionManager:
+    """In-memory sessions; ones idle for `idle_seconds` are evicted by a background task."""
+
+    def __init__(self, client: openai.AsyncOpenAI, summarizer=None,
+                 idle_seconds: float = SESSION_IDLE_SECONDS, max_sessions: int = MAX_SESSIONS):
+        self.client = client
+        self.summarizer = summarizer
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, AsyncAgent] = {}
+        self.evicted = 0
+
+    def create(self) -> str:
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                raise HTTPException(status_code=503, detail="Too many active sessions.")
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = AsyncAgent(self.client, self.summarizer)
+        return session_id
+
+    def get(self, session_id: str) -> AsyncAgent:
+        agent = self.sessions.get(session_id)
+        if agent is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired session.")
+        return agent
+
+    def delete(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        # A session in the middle of a turn holds its lock and is never evicted
+        idle = [sid for sid, agent in self.sessions.items() if agent.last_used < cutoff and not agent.lock.locked()]
+        for session_id in idle:
+            del self.sessions[session_id]
+        self.evicted += len(idle)
+
+    async def evict_forever(self, interval: float = 30.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+
+# ==========================================
+# 3. HTTP / WebSocket API
+# ==========================================
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client for every session's OpenAI calls
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    )
+    client = openai.AsyncOpenAI(http_client=http_client)
+    summarizer = LLMSummarizer(openai.OpenAI(), SUMMARY_MODEL)
+    app.state.sessions = SessionManager(client, summarizer)
+    evictor = asyncio.create_task(app.state.sessions.evict_forever())
+    yield
+    evictor.cancel()
+    await client.close()
+
+
+app = FastAPI(title="AI Agent Server", lifespan=lifespan)
+
+
+class ChatRequest(BaseModel):
+    message: str
+
+
+@app.post("/sessions")
+async def create_session():
+    return {"session_id": app.state.sessions.create()}
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    app.state.sessions.delete(session_id)
+    return {"status": "deleted"}
+
+
+@app.post("/sessions/{session_id}/chat")
+async def chat(session_id: str, request: ChatRequest):
+    agent = app.state.sessions.get(session_id)
+
+    async def events():
+        async for event in agent.chat(request.message):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.websocket("/sessions/{session_id}/ws")
+async def chat_ws(websocket: WebSocket, session_id: str):
+    agent = app.state.sessions.sessions.get(session_id)
+    if agent is None:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                payload = await websocket.receive_json()
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict) or not isinstance(payload.get("message"), str):
+                await websocket.send_json({"type": "error", "error": 'Expected a JSON object like {"message": "..."}.'})
+                continue
+            async for event in agent.chat(payload["message"]):
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/stats")
+async def stats():
+    sessions = app.state.sessions
+    return {
+        "active_sessions": len(sessions.sessions),
+        "evicted_sessions": sessions.evicted,
+        "tools": tool_runner.stats(),
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
@@ -0,0 +1,178 @@
+import json
+import time
+import threading
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Latency percentiles are computed over each tool's most recent calls
+LATENCY_SAMPLES = 1000
+
+
+# ==========================================
+# Memoisation for pure or slow tools
+# ==========================================
+class TTLCache:
+    """In-memory cache whose entries expire `ttl` seconds after they were stored."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop expired entries first, then the oldest insertion
+                now = time.monotonic()
+                for k in [k for k, (exp, _) in self._entries.items() if exp < now]:
+                    del self._entries[k]
+                if len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+
+def memoize(ttl: float, cache: Optional[Any] = None):
+    """
+    Cache a tool's result per argument set for `ttl` seconds. `cache` can be
+    any object with get(key) / set(key, value, ttl) (e.g. a Redis-backed
+    adapter); each decorated tool gets its own TTLCache by default.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        store = cache if cache is not None else TTLCache()
+        counters = {"hits": 0, "misses": 0}
+        # ToolRunner calls tools from several threads at once
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = f"{func.__name__}:{json.dumps([args, kwargs], sort_keys=True, default=str)}"
+            value = store.get(key)
+            with lock:
+                counters["hits" if value is not None else "misses"] += 1
+            if value is not None:
+                return value
+            value = func(*args, **kwargs)
+            store.set(key, value, ttl)
+            return value
+
+        def cache_info():
+            with lock:
+                return dict(counters)
+
+        wrapper.cache_info = cache_info
+        return wrapper
+
+    return decorator
+
+
+# ==========================================
+# Concurrent tool dispatch
+# ==========================================
+class ToolRunner:
+    """
+    Runs the tool calls of one assistant turn concurrently on a shared thread
+    pool, each bounded by its tool's timeout, and keeps per-tool latency stats
+    over the last LATENCY_SAMPLES calls.
+
+    A timed-out tool reports an error to the model straight away, but its
+    thread runs to completion in the background (Python threads can't be
+    cancelled), so tools should still enforce their own I/O timeouts.
+    """
+
+    def __init__(self, functions: Dict[str, Callable], timeouts: Optional[Dict[str, float]] = None,
+                 default_timeout: float = 10.0, max_workers: int = 8):
+        self.functions = functions
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._calls: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._timeouts: Dict[str, int] = {}
+
+    def _call(self, name: str, arguments: str) -> str:
+        start = time.perf_counter()
+        try:
+            try:
+                function_args = json.loads(arguments)
+            except json.JSONDecodeError:
+                self._count(self._errors, name)
+                return json.dumps({"error": "Failed to parse arguments."})
+            try:
+                return self.functions[name](**function_args)
+            except Exception as e:
+                self._count(self._errors, name)
+                return json.dumps({"error": str(e)})
+        finally:
+            with self._lock:
+                self._latencies.setdefault(name, deque(maxlen=LATENCY_SAMPLES)).append(time.perf_counter() - start)
+                self._calls[name] = self._calls.get(name, 0) + 1
+
+    def _count(self, counter: Dict[str, int], name: str):
+        with self._lock:
+            counter[name] = counter.get(name, 0) + 1
+
+    def run(self, tool_calls) -> List[str]:
+        """Execute OpenAI tool_calls concurrently; returns one JSON response per call, in order."""
+        futures = []
+        for tool_call in tool_calls:
+            name = tool_call.function.name
+            if name not in self.functions:
+                print(f"\n[Warning] The model tried to call an unknown function: {name}")
+                futures.append(None)
+            else:
+                futures.append(self.executor.submit(self._call, name, tool_call.function.arguments))
+
+        # All calls were submitted up front, so waiting in order costs no extra time
+        responses = []
+        deadline_start = time.monotonic()
+        for tool_call, future in zip(tool_calls, futures):
+            name = tool_call.function.name
+            if future is None:
+                responses.append(json.dumps({"error": f"Unknown function: {name}"}))
+                continue
+            timeout = self.timeouts.get(name, self.default_timeout)
+            remaining = max(timeout - (time.monotonic() - deadline_start), 0)
+            try:
+                responses.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                self._count(self._timeouts, name)
+                responses.append(json.dumps({"error": f"{name} timed out after {timeout:.1f}s"}))
+        return responses
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        report = {}
+        with self._lock:
+            # A call that is still running after its timeout has no latency sample yet
+            for name in set(self._latencies) | set(self._timeouts):
+                ordered = sorted(self._latencies.get(name, []))
+                report[name] = {
+                    "calls": self._calls.get(name, 0),
+                    "errors": self._errors.get(name, 0),
+                    "timeouts": self._timeouts.get(name, 0),
+                }
+                if ordered:
+                    report[name].update({
+                        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+                        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 2),
+                        "max_ms": round(ordered[-1] * 1000, 2),
+                    })
+        for name, function in self.functions.items():
+            if hasattr(function, "cache_info"):
+                report.setdefault(name, {"calls": 0})["cache"] = function.cache_info()
+        return report
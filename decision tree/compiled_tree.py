@@ -0,0 +1,120 @@
+import os
+import time
+import numpy as np
+
+# Bounded input domain covered by the lookup table (inclusive)
+HOURS_RANGE = (0, 24)
+ATTENDANCE_RANGE = (0, 100)
+
+
+def tree_to_source(model, features=("hours", "attendance"), name="predict_rules"):
+    """Compile a fitted DecisionTreeClassifier into a flat Python if/else function."""
+    tree = model.tree_
+    lines = [f"def {name}({', '.join(features)}):"]
+
+    def walk(node, depth):
+        indent = "    " * depth
+        if tree.children_left[node] == -1:
+            label = model.classes_[np.argmax(tree.value[node][0])].item()
+            lines.append(f"{indent}return {label!r}")
+            return
+        feature = features[tree.feature[node]]
+        lines.append(f"{indent}if {feature} <= {float(tree.threshold[node])!r}:")
+        walk(tree.children_left[node], depth + 1)
+        lines.append(f"{indent}else:")
+        walk(tree.children_right[node], depth + 1)
+
+    walk(0, 1)
+    return "\n".join(lines) + "\n"
+
+
+def compile_rules(source, name="predict_rules"):
+    namespace = {}
+    exec(compile(source, "<compiled tree>", "exec"), namespace)
+    return namespace[name]
+
+
+class CompiledTree:
+    """
+    The tree as flat if/else rules plus a lookup table of precomputed
+    predictions for every (hours, attendance) pair in the bounded domain.
+    Single predictions run the rules, which beats indexing into numpy for one
+    row; batches index the table in one vectorised step, with out-of-range
+    rows falling back to the rules.
+    """
+
+    def __init__(self, table, rules_source, hours_min=HOURS_RANGE[0], attendance_min=ATTENDANCE_RANGE[0]):
+        self.table = table
+        self.rules_source = rules_source
+        self.rules = compile_rules(rules_source)
+        self.hours_min = hours_min
+        self.attendance_min = attendance_min
+
+    @classmethod
+    def from_sklearn(cls, model, hours_range=HOURS_RANGE, attendance_range=ATTENDANCE_RANGE):
+        hours = np.arange(hours_range[0], hours_range[1] + 1)
+        attendance = np.arange(attendance_range[0], attendance_range[1] + 1)
+        grid_h, grid_a = np.meshgrid(hours, attendance, indexing="ij")
+
+        # One sklearn call over the whole domain
+        X = np.column_stack([grid_h.ravel(), grid_a.ravel()])
+        table = model.predict(X).reshape(grid_h.shape)
+
+        return cls(table, tree_to_source(model), hours_range[0], attendance_range[0])
+
+    def predict_one(self, hours, attendance):
+        return self.rules(hours, attendance)
+
+    def predict(self, X):
+        X = np.asarray(X)
+        h = X[:, 0].astype(np.int64) - self.hours_min
+        a = X[:, 1].astype(np.int64) - self.attendance_min
+        in_range = (h >= 0) & (h < self.table.shape[0]) & (a >= 0) & (a < self.table.shape[1])
+
+        predictions = np.empty(len(X), dtype=self.table.dtype)
+        predictions[in_range] = self.table[h[in_range], a[in_range]]
+        for i in np.flatnonzero(~in_range):
+            predictions[i] = self.rules(X[i, 0], X[i, 1])
+        return predictions
+
+
+# ========== Parity Check & Benchmark ==========
+def benchmark(model, compiled, repeats=2000):
+    rng = np.random.default_rng(0)
+    inside = np.column_stack([
+        rng.integers(HOURS_RANGE[0], HOURS_RANGE[1] + 1, repeats),
+        rng.integers(ATTENDANCE_RANGE[0], ATTENDANCE_RANGE[1] + 1, repeats),
+    ])
+    outside = np.column_stack([rng.integers(-50, 200, repeats), rng.integers(-50, 300, repeats)])
+
+    # Parity: in-domain batch rows hit the table, out-of-domain ones the if/else fallback
+    for X in (inside, outside):
+        expected = model.predict(X)
+        assert np.array_equal(compiled.predict(X), expected), "batch parity failed"
+        assert all(compiled.predict_one(int(h), int(a)) == e for (h, a), e in zip(X, expected)), \
+            "single-row parity failed"
+    print(f"Parity OK on {2 * repeats} inputs ({compiled.table.size} table cells)")
+
+    paths = [
+        ("sklearn model.predict", lambda h, a: model.predict([[h, a]])[0]),
+        ("compiled if/else", compiled.predict_one),
+        ("lookup table", lambda h, a: compiled.table[h - compiled.hours_min, a - compiled.attendance_min]),
+    ]
+    rows = [(int(h), int(a)) for h, a in inside]
+    for name, fn in paths:
+        start = time.perf_counter()
+        for h, a in rows:
+            fn(h, a)
+        per_call = (time.perf_counter() - start) / len(rows)
+        print(f"{name:<24}{per_call * 1e6:>10.2f} µs/prediction")
+
+
+if __name__ == "__main__":
+    from model_manager import ModelManager
+
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    manager = ModelManager(os.path.join(BASE_DIR, "data.csv"), os.path.join(BASE_DIR, "model.joblib"))
+    manager.load()
+    compiled = CompiledTree.from_sklearn(manager.model)
+
+    benchmark(manager.model, compiled)
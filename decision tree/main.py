@@ -1,35 +1,43 @@
 import os
-from fastapi import FastAPI, Request, Form
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-import pandas as pd
-from sklearn.tree import DecisionTreeClassifier
+from pydantic import BaseModel, Field
+import numpy as np
+from model_manager import ModelManager
 
 # ========== Absolute Paths (FIXES SPACE IN FOLDER) ==========
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "data.csv")
+MODEL_PATH = os.path.join(BASE_DIR, "model.joblib")
 TEMPLATES_PATH = os.path.join(BASE_DIR, "templates")
 
-# ========== App Setup ==========
-app = FastAPI()
-templates = Jinja2Templates(directory=TEMPLATES_PATH)
+# ========== Model Manager (loads on boot, retrains when data.csv changes) ==========
+model_manager = ModelManager(DATA_PATH, MODEL_PATH)
 
-# ========== Load & Train Model Safely ==========
-def train_model():
-    print("Loading dataset from:", DATA_PATH)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    model_manager.start()
+    yield
+    model_manager.stop()
 
-    df = pd.read_csv(DATA_PATH)
-
-    X = df[["hours", "attendance"]]
-    y = df["result"]
+# ========== App Setup ==========
+app = FastAPI(lifespan=lifespan)
+templates = Jinja2Templates(directory=TEMPLATES_PATH)
 
-    model = DecisionTreeClassifier(random_state=42)
-    model.fit(X, y)
+# ========== Schemas ==========
+# Bounded like the data the tree is trained on; this also keeps batch inputs within int64
+class StudentInput(BaseModel):
+    hours: int = Field(ge=0, le=24)
+    attendance: int = Field(ge=0, le=100)
 
-    print("Model trained successfully!")
-    return model
+class BatchInput(BaseModel):
+    students: List[StudentInput]
 
-model = train_model()
+def format_result(prediction):
+    return "PASS ✅" if prediction == 1 else "FAIL ❌"
 
 # ========== Routes ==========
 
@@ -47,9 +55,9 @@ def predict(
     hours: int = Form(...),
     attendance: int = Form(...)
 ):
-    prediction = model.predict([[hours, attendance]])[0]
+    prediction = model_manager.predict_one(hours, attendance)
 
-    result = "PASS ✅" if prediction == 1 else "FAIL ❌"
+    result = format_result(prediction)
 
     return templates.TemplateResponse(
         "result.html",
@@ -60,3 +68,30 @@ def predict(
             "result": result
         }
     )
+
+
+@app.post("/api/predict")
+def api_predict(student: StudentInput):
+    prediction = model_manager.predict_one(student.hours, student.attendance)
+    return {"prediction": prediction, "result": format_result(prediction)}
+
+
+@app.post("/api/predict/batch")
+def api_predict_batch(batch: BatchInput):
+    if not batch.students:
+        raise HTTPException(status_code=400, detail="No students provided.")
+
+    X = np.array([[s.hours, s.attendance] for s in batch.students])
+    predictions = model_manager.predict(X)
+
+    return {
+        "predictions": [
+            {"prediction": int(p), "result": format_result(p)}
+            for p in predictions
+        ]
+    }
+
+
+@app.get("/api/model")
+def model_info():
+    return model_manager.info
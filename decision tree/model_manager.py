@@ -0,0 +1,141 @@
+import os
+import hashlib
+import threading
+from datetime import datetime
+import joblib
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+from compiled_tree import CompiledTree
+
+FEATURES = ["hours", "attendance"]
+TARGET = "result"
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class ModelManager:
+    """
+    Owns the served DecisionTreeClassifier.
+
+    On boot it loads the persisted model if it was trained on the current
+    data.csv, otherwise it trains and persists a fresh one. A background
+    thread watches data.csv (mtime first, then content hash) and retrains on
+    change. The model, its metadata and its compiled lookup table are swapped
+    as a single tuple, so a request always sees a consistent set and is never
+    blocked by a retrain.
+    """
+
+    def __init__(self, data_path, model_path, poll_interval=2.0):
+        self.data_path = data_path
+        self.model_path = model_path
+        self.poll_interval = poll_interval
+        self._current = (None, {}, None)
+        self._last_mtime = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ========== Model Access ==========
+    @property
+    def model(self):
+        return self._current[0]
+
+    @property
+    def info(self):
+        return self._current[1]
+
+    def predict(self, X):
+        compiled = self._current[2]
+        if compiled is None:
+            raise RuntimeError("Model is not loaded yet.")
+        return compiled.predict(X)
+
+    def predict_one(self, hours, attendance):
+        compiled = self._current[2]
+        if compiled is None:
+            raise RuntimeError("Model is not loaded yet.")
+        return compiled.predict_one(hours, attendance)
+
+    def _swap(self, model, info):
+        self._current = (model, info, CompiledTree.from_sklearn(model))
+
+    # ========== Training & Persistence ==========
+    def train(self, data_hash):
+        print("Loading dataset from:", self.data_path)
+
+        df = pd.read_csv(self.data_path)
+
+        # Fit on plain arrays so predictions can skip feature-name checks
+        X = df[FEATURES].to_numpy()
+        y = df[TARGET].to_numpy()
+
+        model = DecisionTreeClassifier(random_state=42)
+        model.fit(X, y)
+
+        info = {
+            "data_hash": data_hash,
+            "trained_at": datetime.now().isoformat(),
+            "rows": len(df),
+        }
+        # Write-then-rename so other workers never load a half-written file
+        tmp_path = f"{self.model_path}.tmp{os.getpid()}"
+        joblib.dump((model, info), tmp_path)
+        os.replace(tmp_path, self.model_path)
+
+        print("Model trained successfully!")
+        return model, info
+
+    def load(self):
+        """Load the persisted model, retraining only if data.csv has changed."""
+        self._last_mtime = os.path.getmtime(self.data_path)
+        data_hash = file_hash(self.data_path)
+
+        if os.path.exists(self.model_path):
+            try:
+                model, info = joblib.load(self.model_path)
+                if info.get("data_hash") == data_hash:
+                    self._swap(model, info)
+                    print("Loaded persisted model from:", self.model_path)
+                    return
+            except Exception as e:
+                print(f"Could not load persisted model, retraining: {e}")
+
+        self._swap(*self.train(data_hash))
+
+    def reload_if_changed(self):
+        mtime = os.path.getmtime(self.data_path)
+        if mtime == self._last_mtime:
+            return False
+
+        # mtime moves on touch/copy too; only retrain if the content changed
+        data_hash = file_hash(self.data_path)
+        changed = data_hash != self.info.get("data_hash")
+        if changed:
+            self._swap(*self.train(data_hash))
+            print("Model hot-reloaded after data change.")
+
+        # Only recorded once the data is handled: a failed retrain is retried on the next poll
+        self._last_mtime = mtime
+        return changed
+
+    # ========== Background Watcher ==========
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                # Keep serving the previous model if the new data is broken
+                print(f"Retrain failed, keeping current model: {e}")
+
+    def start(self):
+        self.load()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,84 @@
+"""
+CPU inference benchmark for the llm_service backends.
+
+Each backend is measured in a fresh process so load time and memory are not
+shared between runs. Reports model load time, peak RSS and the greedy decode
+latency per generated token over a handful of prompts.
+
+    python -m backend.benchmark_llm --backends pytorch int8 onnx
+"""
+import sys
+import time
+import argparse
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+PROMPTS = [
+    "What is the capital of France?",
+    "Explain photosynthesis in one sentence.",
+    "Translate to German: How old are you?",
+    "Why is the sky blue?",
+    "Give me three tips for writing clean Python code.",
+]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux but bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def measure(backend: str, rounds: int) -> dict:
+    from backend import llm_service
+
+    baseline_mb = peak_rss_mb()
+    start = time.perf_counter()
+    _, model = llm_service.load_model(backend)
+    load_s = time.perf_counter() - start
+    if model is None:
+        return {"backend": backend, "error": "failed to load"}
+
+    llm_service.warm_up()
+    tokens, elapsed = 0, 0.0
+    for _ in range(rounds):
+        for prompt in PROMPTS:
+            t0 = time.perf_counter()
+            _, generated = llm_service.generate_batch([prompt])
+            elapsed += time.perf_counter() - t0
+            tokens += generated
+
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "model_mb": peak_rss_mb() - baseline_mb,
+        "peak_mb": peak_rss_mb(),
+        "ms_per_token": elapsed / max(tokens, 1) * 1000,
+        "tokens": tokens,
+    }
+
+
+def run_benchmark(backends, rounds: int):
+    print(f"{'Backend':<10}{'load s':>8}{'model MB':>10}{'peak MB':>10}{'ms/token':>10}{'tokens':>8}")
+    for backend in backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            try:
+                row = pool.submit(measure, backend, rounds).result()
+            except Exception as e:
+                row = {"backend": backend, "error": str(e)}
+
+        if "error" in row:
+            print(f"{backend:<10}{row['error']:>46}")
+            continue
+        print(f"{backend:<10}{row['load_s']:>8.2f}{row['model_mb']:>10.0f}{row['peak_mb']:>10.0f}"
+              f"{row['ms_per_token']:>10.2f}{row['tokens']:>8}")
+
+
+if __name__ == "__main__":
+    from backend.llm_service import LLM_BACKENDS
+
+    parser = argparse.ArgumentParser(description="Compare llm_service inference backends on CPU")
+    parser.add_argument("--backends", nargs="+", choices=LLM_BACKENDS, default=list(LLM_BACKENDS))
+    parser.add_argument("--rounds", type=int, default=3, help="Passes over the prompt set per backend")
+    args = parser.parse_args()
+    run_benchmark(args.backends, args.rounds)
@@ -1,31 +1,285 @@
 import os
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import time
+import queue
+import asyncio
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, TextIteratorStreamer
 
-# Load the model outside the request handler so it's only loaded once when the server starts
-# We use a small model for fast CPU inference on a Mac.
+# Loaded lazily by load_model() (or eagerly via warm_up() at server startup) rather than
+# at import. We use a small model for fast CPU inference on a Mac.
 MODEL_NAME = "google/flan-t5-small"
-print(f"Loading LLM {MODEL_NAME}...")
-
-try:
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
-    print("LLM loaded successfully.")
-except Exception as e:
-    print(f"Error loading LLM: {e}")
-    tokenizer = None
-    model = None
-
-def generate_response(prompt: str) -> str:
+
+# Inference backend: "pytorch" (fp32, the original path), "int8" (dynamic int8
+# quantisation of the Linear layers) or "onnx" (ONNX Runtime export; needs optimum[onnxruntime])
+LLM_BACKENDS = ("pytorch", "int8", "onnx")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "pytorch").lower()
+# The ONNX export is saved here on first use and loaded from here afterwards
+ONNX_DIR = os.getenv("LLM_ONNX_DIR", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".onnx", MODEL_NAME.replace("/", "--")))
+
+tokenizer = None
+model = None
+load_seconds = None
+_load_lock = threading.Lock()
+_load_attempted = False
+
+def _load_backend(backend: str):
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        if os.path.isdir(ONNX_DIR):
+            return ORTModelForSeq2SeqLM.from_pretrained(ONNX_DIR)
+
+        # Exporting takes far longer than loading, so it happens once. Save to a
+        # temporary directory first so an interrupted save isn't mistaken for an export.
+        ort_model = ORTModelForSeq2SeqLM.from_pretrained(MODEL_NAME, export=True)
+        tmp_dir = f"{ONNX_DIR}.tmp{os.getpid()}"
+        ort_model.save_pretrained(tmp_dir)
+        os.replace(tmp_dir, ONNX_DIR)
+        return ort_model
+
+    pt_model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+    pt_model.eval()
+    if backend == "int8":
+        import torch
+        pt_model = torch.ao.quantization.quantize_dynamic(pt_model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pt_model
+
+def load_model(backend: str = LLM_BACKEND) -> tuple:
+    """Load the tokenizer and model once per process; returns (None, None) if loading failed."""
+    global tokenizer, model, load_seconds, _load_attempted
+    with _load_lock:
+        if not _load_attempted:
+            _load_attempted = True
+            print(f"Loading LLM {MODEL_NAME} ({backend} backend)...")
+            start = time.perf_counter()
+            try:
+                if backend not in LLM_BACKENDS:
+                    raise ValueError(f"Unknown LLM_BACKEND '{backend}', expected one of {LLM_BACKENDS}")
+                tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+                model = _load_backend(backend)
+                load_seconds = time.perf_counter() - start
+                print(f"LLM loaded successfully in {load_seconds:.1f}s.")
+            except Exception as e:
+                print(f"Error loading LLM: {e}")
+                tokenizer = None
+                model = None
+    return tokenizer, model
+
+def warm_up():
+    """Load the model and run one short generation so the first request doesn't pay for either."""
+    tok, mdl = load_model()
+    if mdl is not None:
+        mdl.generate(**tok(build_input("Hello"), return_tensors="pt"), max_new_tokens=4)
+
+# Dynamic batching: wait up to BATCH_WINDOW_MS after the first prompt for others to join
+MAX_BATCH_SIZE = int(os.getenv("LLM_MAX_BATCH_SIZE", "8"))
+BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "20"))
+MAX_NEW_TOKENS = 150
+RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "1024"))
+# Streaming generations can't share the batcher's padded generate call, so they
+# get their own cap; a stream waits at most STREAM_TIMEOUT_S for a slot or a token
+MAX_STREAMS = int(os.getenv("LLM_MAX_STREAMS", "2"))
+STREAM_TIMEOUT_S = float(os.getenv("LLM_STREAM_TIMEOUT_S", "60"))
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+def build_input(prompt: str) -> str:
+    # Wrap the prompt to make it instruction-like for flan-t5
+    return f"Answer the following question: {prompt}"
+
+def generate_batch(prompts: list) -> tuple:
+    """Pad-batch prompts through one generate call; returns (responses, generated token count)."""
+    inputs = tokenizer([build_input(p) for p in prompts], return_tensors="pt", padding=True)
+    outputs = model.generate(**inputs, max_new_tokens=MAX_NEW_TOKENS)
+    # T5 starts decoding from the pad token, so non-pad tokens are exactly the generated ones
+    generated_tokens = int((outputs != tokenizer.pad_token_id).sum())
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True), generated_tokens
+
+class ResponseCache:
+    """
+    LRU of (normalised prompt, generation params) -> response. Only valid
+    because decoding is greedy and therefore deterministic; sampling
+    parameters would have to bypass it.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prompt: str) -> tuple:
+        return (" ".join(prompt.split()), MAX_NEW_TOKENS, "greedy")
+
+    def get(self, prompt: str):
+        key = self.key(prompt)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, prompt: str, response: str):
+        key = self.key(prompt)
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+response_cache = ResponseCache()
+
+class BatchingWorker:
+    """
+    Background thread that groups concurrent prompts into one padded
+    model.generate call. Callers get a Future per prompt, so the event loop
+    only awaits while the model runs on this thread.
+    """
+
+    def __init__(self, max_batch_size: int = MAX_BATCH_SIZE, window_ms: float = BATCH_WINDOW_MS):
+        self.max_batch_size = max_batch_size
+        self.window_s = window_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.generated_tokens = 0
+        self.generate_seconds = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, prompt: str) -> Future:
+        self.start()
+        future = Future()
+        self._queue.put((prompt, future))
+        return future
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            prompts = [prompt for prompt, _ in batch]
+            start = time.perf_counter()
+            try:
+                responses, tokens = generate_batch(prompts)
+            except Exception as e:
+                print(f"Generation error: {e}")
+                for _, future in batch:
+                    future.set_result("An error occurred during text generation.")
+                continue
+
+            with self._lock:
+                self.batch_sizes[len(batch)] += 1
+                self.generated_tokens += tokens
+                self.generate_seconds += time.perf_counter() - start
+            for (_, future), response in zip(batch, responses):
+                future.set_result(response)
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = sum(self.batch_sizes.values())
+            return {
+                "batches": batches,
+                "prompts": sum(size * count for size, count in self.batch_sizes.items()),
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+                "generated_tokens": self.generated_tokens,
+                "tokens_per_second": round(self.generated_tokens / self.generate_seconds, 2)
+                if self.generate_seconds else 0.0,
+            }
+
+batcher = BatchingWorker()
+
+async def generate_response_async(prompt: str) -> str:
+    """Generate a response without blocking the event loop; the prompt is batched with concurrent chats."""
+    if model is None:
+        await asyncio.to_thread(load_model)
     if not model or not tokenizer:
         return "Error: LLM failed to load."
-    
-    # Generate the response
+
+    cached = response_cache.get(prompt)
+    if cached is not None:
+        return cached
+
+    response = await asyncio.wrap_future(batcher.submit(prompt))
+    response_cache.put(prompt, response)
+    return response
+
+def stream_response(prompt: str):
+    """
+    Yield the response in text chunks as flan-t5 decodes them. Generation
+    runs on its own thread, at most MAX_STREAMS at a time; this generator
+    blocks on the streamer, so callers should iterate it off the event loop.
+    Raises TimeoutError if no slot frees up or the model stalls.
+    """
+    load_model()
+    if not model or not tokenizer:
+        yield "Error: LLM failed to load."
+        return
+
+    cached = response_cache.get(prompt)
+    if cached is not None:
+        yield cached
+        return
+
+    if not _stream_slots.acquire(timeout=STREAM_TIMEOUT_S):
+        raise TimeoutError("Too many concurrent streams, try again shortly.")
+
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=STREAM_TIMEOUT_S)
+    inputs = tokenizer(build_input(prompt), return_tensors="pt")
+    failed = threading.Event()
+
+    def generate():
+        try:
+            model.generate(**inputs, max_new_tokens=MAX_NEW_TOKENS, streamer=streamer)
+        except Exception as e:
+            print(f"Generation error: {e}")
+            failed.set()
+        finally:
+            # Unblocks the reader even if generate raised before finishing the stream
+            streamer.end()
+            _stream_slots.release()
+
+    try:
+        thread = threading.Thread(target=generate, name="llm-stream", daemon=True)
+        thread.start()
+    except BaseException:
+        _stream_slots.release()
+        raise
+
+    chunks = []
     try:
-        # Wrap the prompt to make it instruction-like for flan-t5
-        input_text = f"Answer the following question: {prompt}"
-        inputs = tokenizer(input_text, return_tensors="pt")
-        outputs = model.generate(**inputs, max_new_tokens=150)
-        return tokenizer.decode(outputs[0], skip_special_tokens=True)
-    except Exception as e:
-        print(f"Generation error: {e}")
-        return "An error occurred during text generation."
+        for chunk in streamer:
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+    except queue.Empty:
+        raise TimeoutError(f"No output from the model for {STREAM_TIMEOUT_S:g}s.")
+    thread.join()
+    if failed.is_set():
+        raise RuntimeError("An error occurred during text generation.")
+    response_cache.put(prompt, "".join(chunks))
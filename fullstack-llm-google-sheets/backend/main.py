@@ -1,10 +1,26 @@
+import json
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from backend.llm_service import generate_response
-from backend.sheets_service import export_to_sheet
+from backend import llm_service
+from backend.llm_service import generate_response_async, stream_response, warm_up, batcher, response_cache
+from backend.sheets_service import export_to_sheet, export_queue
 
-app = FastAPI(title="AI Chat App with Google Sheets")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm the model in the background so the port opens immediately;
+    # requests that arrive first simply wait on the load.
+    threading.Thread(target=warm_up, name="llm-warm-up", daemon=True).start()
+    # Replays any rows left in the export journal by a previous run
+    export_queue.start()
+    yield
+    export_queue.stop()
+
+app = FastAPI(title="AI Chat App with Google Sheets", lifespan=lifespan)
 
 # Enable CORS for the frontend
 app.add_middleware(
@@ -25,22 +41,50 @@ class ExportRequest(BaseModel):
 @app.post("/api/chat")
 async def chat_endpoint(request: ChatRequest):
     try:
-        response_text = generate_response(request.prompt)
+        response_text = await generate_response_async(request.prompt)
         return {"response": response_text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/chat/stream")
+def chat_stream_endpoint(request: ChatRequest):
+    # Server-sent events: one `data:` message per decoded chunk, then a `done` event.
+    # The generator blocks on the model, so StreamingResponse iterates it in a threadpool.
+    def events():
+        try:
+            for chunk in stream_response(request.prompt):
+                yield f"data: {json.dumps({'token': chunk})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/api/export")
 async def export_endpoint(request: ExportRequest):
     try:
-        success = export_to_sheet(request.prompt, request.response)
+        # export_to_sheet fsyncs the journal, so it runs in a worker thread
+        success = await asyncio.to_thread(export_to_sheet, request.prompt, request.response)
         if success:
-            return {"status": "success", "message": "Exported to Google Sheets"}
+            return {"status": "success", "message": "Queued for export to Google Sheets"}
         else:
             raise HTTPException(status_code=500, detail="Failed to export data")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/stats")
+async def stats_endpoint():
+    return {
+        "llm": {
+            **batcher.stats(),
+            "backend": llm_service.LLM_BACKEND,
+            "loaded": llm_service.model is not None,
+            "load_seconds": llm_service.load_seconds,
+        },
+        "response_cache": response_cache.stats(),
+        "sheets_export": export_queue.stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8888)
@@ -1,4 +1,9 @@
 import os
+import csv
+import json
+import time
+import random
+import threading
 import gspread
 from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
@@ -14,43 +19,249 @@ SCOPES = [
 CREDENTIALS_FILE = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "../credentials.json")
 SHEET_ID = os.getenv("GOOGLE_SHEET_ID", "YOUR_SPREADSHEET_ID_HERE")
 
+# Export queue: rows are flushed with one append_rows call once EXPORT_BATCH_ROWS are
+# pending or EXPORT_FLUSH_SECONDS after the oldest one arrived, whichever comes first
+EXPORT_BATCH_ROWS = int(os.getenv("SHEETS_EXPORT_BATCH_ROWS", "50"))
+EXPORT_FLUSH_SECONDS = float(os.getenv("SHEETS_EXPORT_FLUSH_SECONDS", "2"))
+EXPORT_JOURNAL = os.getenv("SHEETS_EXPORT_JOURNAL", "sheets_export_journal.jsonl")
+# Set to a CSV path to write exports there instead of Google Sheets (local development, tests)
+LOCAL_SHEET = os.getenv("SHEETS_LOCAL_FILE", "")
+
+_client = None
+_worksheet = None
+_client_lock = threading.Lock()
+
 def get_sheets_client():
+    """Authorise once per process; later calls reuse the client (gspread refreshes the token itself)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            return _client
+
+        if not os.path.exists(CREDENTIALS_FILE):
+            print(f"WARNING: Credentials file not found at {CREDENTIALS_FILE}")
+            return None
+
+        try:
+            credentials = Credentials.from_service_account_file(
+                CREDENTIALS_FILE, scopes=SCOPES)
+            _client = gspread.authorize(credentials)
+            return _client
+        except Exception as e:
+            print(f"Failed to authorize Google Sheets: {e}")
+            return None
+
+class LocalSheet:
+    """
+    Stand-in for a gspread Worksheet that appends rows to a CSV file. Used when
+    SHEETS_LOCAL_FILE is set or no credentials are available, and as the fake
+    to run the export queue against without touching Google.
+    """
+
+    def __init__(self, path: str = "sheets_export_local.csv"):
+        self.path = path
+
+    def append_rows(self, values, value_input_option="RAW"):
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(values)
+
+def get_worksheet():
+    """
+    Return the target worksheet, opening it only once per process. Failures
+    raise and are retried on the next call; only a missing credentials file
+    selects the local CSV for good.
+    """
+    global _worksheet
+    if _worksheet is not None:
+        return _worksheet
+    if LOCAL_SHEET:
+        _worksheet = LocalSheet(LOCAL_SHEET)
+        return _worksheet
+
     if not os.path.exists(CREDENTIALS_FILE):
-        print(f"WARNING: Credentials file not found at {CREDENTIALS_FILE}")
-        return None
-        
-    try:
-        credentials = Credentials.from_service_account_file(
-            CREDENTIALS_FILE, scopes=SCOPES)
-        client = gspread.authorize(credentials)
-        return client
-    except Exception as e:
-        print(f"Failed to authorize Google Sheets: {e}")
-        return None
+        # For local testing without credentials, we write to a local CSV instead
+        print("MOCKING GOOGLE SHEETS EXPORT: Credentials missing, writing to a local CSV.")
+        _worksheet = LocalSheet()
+        return _worksheet
 
-def export_to_sheet(prompt: str, response: str) -> bool:
-    print(f"Attempting to export to sheet. Prompt: {prompt[:30]}...")
     client = get_sheets_client()
-    
     if not client:
-        # For local testing without credentials, we mock the success
-        print("MOCKING GOOGLE SHEETS EXPORT: Credentials missing.")
-        print(f"Would have exported -> Prompt: {prompt}, Response: {response}")
-        return True
-        
+        # Credentials are configured, so this is a transient failure: raise (the
+        # export queue retries the batch) rather than pinning the CSV fallback
+        raise RuntimeError("Could not authorize Google Sheets.")
+
+    # Open by ID is most reliable
     try:
-        # Open by ID is most reliable
-        try:
-            sheet = client.open_by_key(SHEET_ID).sheet1
-        except Exception:
-            # Fallback for testing, opens the first spreadsheet available to the service account
-            print(f"Could not open spreadsheet by ID {SHEET_ID}. Attempting to open the first available sheet...")
-            sheet = client.openall()[0].sheet1
-            
-        # Append a new row with Prompt and Response
-        sheet.append_row([prompt, response])
-        print("Successfully exported to Google Sheets.")
+        _worksheet = client.open_by_key(SHEET_ID).sheet1
+    except Exception:
+        # Fallback for testing, opens the first spreadsheet available to the service account
+        print(f"Could not open spreadsheet by ID {SHEET_ID}. Attempting to open the first available sheet...")
+        _worksheet = client.openall()[0].sheet1
+    return _worksheet
+
+def is_retryable(error: Exception) -> bool:
+    """Quota (429) and server-side errors are worth retrying; other API errors are not."""
+    if isinstance(error, gspread.exceptions.APIError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    # Network errors, timeouts, etc.
+    return True
+
+class ExportQueue:
+    """
+    Background writer that coalesces exported rows into append_rows batches.
+
+    Every row is appended to a JSONL journal before export_to_sheet returns, and
+    the journal is rewritten with whatever is still pending after each
+    successful flush. Rows survive a restart and are replayed on start().
+    Delivery is at-least-once: a crash between a successful append and the
+    journal rewrite re-sends that batch.
+    """
+
+    def __init__(self, worksheet_factory=get_worksheet, journal_path: str = EXPORT_JOURNAL,
+                 batch_rows: int = EXPORT_BATCH_ROWS, flush_seconds: float = EXPORT_FLUSH_SECONDS,
+                 max_backoff: float = 60.0):
+        self.worksheet_factory = worksheet_factory
+        self.journal_path = journal_path
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.max_backoff = max_backoff
+        self._pending = []
+        self._oldest = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._stopped = threading.Event()
+        self.counters = {"enqueued": 0, "exported": 0, "batches": 0, "retries": 0, "failed": 0}
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._pending = self._read_journal()
+            if self._pending:
+                print(f"Replaying {len(self._pending)} unexported rows from {self.journal_path}")
+                self._oldest = time.monotonic()
+            self._stopping = False
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="sheets-export", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Flush what can be flushed within `timeout`; anything left stays in the journal."""
+        with self._cond:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._stopped.set()
+            self._cond.notify()
+        self._thread.join(timeout)
+        # A writer still blocked in append_rows keeps its handle, so start() won't run a second one beside it
+        if not self._thread.is_alive():
+            self._thread = None
+
+    def put(self, row: list):
+        with self._cond:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending.append(row)
+            self.counters["enqueued"] += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._pending) >= self.batch_rows:
+                self._cond.notify()
+
+    def _read_journal(self) -> list:
+        if not os.path.exists(self.journal_path):
+            return []
+        rows = []
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write
+                    print(f"Skipping unreadable journal line: {line[:60]!r}")
+        return rows
+
+    def _rewrite_journal(self):
+        # Called with the lock held
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in self._pending)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    def _next_batch(self):
+        """Block until a batch is due; returns None once stopped with nothing left."""
+        with self._cond:
+            while True:
+                if self._pending:
+                    due = self._oldest + self.flush_seconds
+                    if self._stopping or len(self._pending) >= self.batch_rows or time.monotonic() >= due:
+                        return self._pending[:self.batch_rows]
+                    self._cond.wait(due - time.monotonic())
+                elif self._stopping:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _run(self):
+        backoff = 1.0
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            exported = True
+            try:
+                self.worksheet_factory().append_rows(batch, value_input_option="RAW")
+            except Exception as e:
+                if is_retryable(e):
+                    with self._cond:
+                        self.counters["retries"] += 1
+                    delay = backoff * random.uniform(0.5, 1.5)
+                    print(f"Sheets export failed ({e}); retrying {len(batch)} rows in {delay:.1f}s")
+                    # On shutdown the rows simply stay in the journal for the next start
+                    if self._stopped.wait(delay):
+                        return
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                print(f"Dropping {len(batch)} rows that Google Sheets rejected: {e}")
+                with open(f"{self.journal_path}.failed", "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(row) + "\n" for row in batch)
+                exported = False
+
+            backoff = 1.0
+            with self._cond:
+                if exported:
+                    self.counters["exported"] += len(batch)
+                    self.counters["batches"] += 1
+                else:
+                    self.counters["failed"] += len(batch)
+                del self._pending[:len(batch)]
+                self._oldest = time.monotonic() if self._pending else None
+                self._rewrite_journal()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self.counters, "pending": len(self._pending)}
+
+export_queue = ExportQueue()
+
+def export_to_sheet(prompt: str, response: str) -> bool:
+    """
+    Queue a row for export; the background writer appends it with the next
+    batch. Blocks on the journal fsync, so call it off the event loop.
+    """
+    print(f"Queueing export to sheet. Prompt: {prompt[:30]}...")
+    try:
+        export_queue.start()
+        export_queue.put([prompt, response])
         return True
     except Exception as e:
-        print(f"Error appending to sheet: {e}")
+        print(f"Error queueing export: {e}")
         return False
@@ -50,7 +50,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const loadingId = addLoadingIndicator();
 
         try {
-            const response = await fetch(`${API_BASE_URL}/api/chat`, {
+            const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -58,16 +58,31 @@ document.addEventListener('DOMContentLoaded', () => {
                 body: JSON.stringify({ prompt: text })
             });
 
-            if (!response.ok) {
+            if (!response.ok || !response.body) {
                 throw new Error('Network response was not ok');
             }
 
-            const data = await response.json();
-            currentResponse = data.response;
+            // Swap the loading indicator for the bot message on the first token
+            let botMessage = null;
+            currentResponse = '';
+            await readEventStream(response.body, (event, data) => {
+                if (event === 'error') {
+                    throw new Error(data.error);
+                }
+                if (data.token === undefined) return;
+                if (!botMessage) {
+                    removeElement(loadingId);
+                    botMessage = appendMessage('bot-message', '');
+                }
+                currentResponse += data.token;
+                botMessage.textContent = currentResponse;
+                scrollToBottom();
+            });
 
-            // Remove loading and add bot message
-            removeElement(loadingId);
-            appendMessage('bot-message', currentResponse);
+            if (!botMessage) {
+                removeElement(loadingId);
+                appendMessage('bot-message', currentResponse);
+            }
 
             // Enable export button since we have a new Q&A pair
             exportBtn.disabled = false;
@@ -79,6 +94,34 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
+    // Minimal server-sent events reader for a fetch body (EventSource can't POST)
+    async function readEventStream(body, onEvent) {
+        const reader = body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                if (event === 'done') return;
+                onEvent(event, data ? JSON.parse(data) : {});
+            }
+        }
+    }
+
     async function handleExport() {
         if (!currentPrompt || !currentResponse) return;
 
@@ -119,6 +162,7 @@ document.addEventListener('DOMContentLoaded', () => {
         msgDiv.textContent = text;
         chatHistory.appendChild(msgDiv);
         scrollToBottom();
+        return msgDiv;
     }
 
     function addLoadingIndicator() {